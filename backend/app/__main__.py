@@ -0,0 +1,8 @@
+# __main__.py - `python -m app` entry point
+# Kept separate from app.main: spawned worker processes (PDF extraction pool)
+# re-import the __main__ module, and this one imports nothing of the app
+import uvicorn
+
+if __name__ == "__main__":
+    # uvloop event loop + httptools parser (both ship with uvicorn[standard])
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
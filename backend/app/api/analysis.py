@@ -3,15 +3,27 @@
 # ✅ NO BREAKING CHANGES: All route names and function signatures preserved
 
 from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 from app.services.vector_service import vector_service
 from app.services.llm_service import llm_service
+from app.services.semantic_cache import semantic_cache
+from app.services.llm_cache import llm_cache
+from app.services.retrieval_cache import retrieval_cache
 from app.api.auth import get_current_session
+from app.utils.json_utils import extract_json_span, loads as json_loads
+from app.utils.time_utils import now_iso
+from app.utils.single_flight import SingleFlight
+import asyncio
+import bisect
+import copy
+import functools
 import logging
-from datetime import datetime
 import json
-import re
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+import orjson
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -31,32 +43,127 @@ class AnalysisResponse(BaseModel):
     timestamp: str
     session_id: str
 
+class FullAnalysisResponse(BaseModel):
+    analyses: dict
+    relevant_chunks: list
+    status: str
+    timestamp: str
+    session_id: str
+
+# 🆕 LLM result shapes: validated in one pass, defaults fill missing fields,
+# extra keys from the prompt's JSON format pass through untouched
+class RiskAnalysisResult(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    risks: List[Dict[str, Any]] = Field(default_factory=list)
+    total_risks: int = 0
+
+class NegotiationAnalysisResult(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    emails: Dict[str, Any] = Field(default_factory=dict)
+
+class SummaryAnalysisResult(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    summary: str = ""
+    key_points: list = Field(default_factory=list)
+
+ANALYSIS_RESULT_MODELS = {
+    "risk": RiskAnalysisResult,
+    "negotiation": NegotiationAnalysisResult,
+    "summary": SummaryAnalysisResult
+}
+
 
 # ============================================================================
 # NEW HELPER FUNCTIONS (Added for Enhanced RAG)
 # ============================================================================
 
-def _format_chunk_with_metadata(chunk: Dict[str, Any], index: int) -> str:
-    """
-    🆕 Format chunks with metadata for better LLM context understanding
-    Includes: section markers, relevance scores, and structural context
-    """
+# 🆕 Constant pieces of a formatted prompt section, built once at import
+_SECTION_RULE = "═══════════════════════════════════════════════════════════════"
+_SECTION_HEAD = "\n" + _SECTION_RULE + "\n📋 SECTION "
+_SECTION_SEPARATED_HEAD = "\n\n" + _SECTION_HEAD
+_SECTION_LABEL_OPEN = " ["
+_SECTION_SCORE_OPEN = "] (Score: "
+_SECTION_BODY_OPEN = ")\n───────────────────────────────────────────────────────────────\n"
+_SECTION_FOOT = "\n" + _SECTION_RULE + "\n"
+
+# Relevance buckets: a score strictly above a threshold moves up one label
+_LABEL_THRESHOLDS = (0.5, 0.7)
+_LABELS = ("CONTEXT", "MODERATE RELEVANCE", "HIGH RELEVANCE")
+
+# Per-chunk prompt cap (~1.5k tokens). Normal 500-word chunks fit with room to
+# spare; this only trims oversized sections so one chunk can't balloon the prompt
+_MAX_CHUNK_CHARS = 6000
+_TRUNCATION_MARK = "…[truncated]"
+
+
+def _append_chunk_parts(parts: List[str], chunk: Dict[str, Any], index: int):
+    """🆕 Extend parts with one chunk's section (header, relevance metadata, text, footer)"""
     chunk_text = chunk.get('text', '')
+    if len(chunk_text) > _MAX_CHUNK_CHARS:
+        chunk_text = chunk_text[:_MAX_CHUNK_CHARS] + _TRUNCATION_MARK
     chunk_index = chunk.get('chunk_index', index)
     relevance_score = chunk.get('score', 0.0)
-    section_type = chunk.get('section_type', 'standard')
     
     # Add relevance indicator for LLM awareness
-    relevance_label = "HIGH RELEVANCE" if relevance_score > 0.7 else "MODERATE RELEVANCE" if relevance_score > 0.5 else "CONTEXT"
+    relevance_label = _LABELS[bisect.bisect_left(_LABEL_THRESHOLDS, relevance_score)]
     
-    formatted = f"""
-═══════════════════════════════════════════════════════════════
-📋 SECTION {chunk_index + 1} [{relevance_label}] (Score: {relevance_score:.2f})
-───────────────────────────────────────────────────────────────
-{chunk_text}
-═══════════════════════════════════════════════════════════════
-"""
-    return formatted
+    parts.extend((
+        _SECTION_SEPARATED_HEAD if index else _SECTION_HEAD,
+        str(chunk_index + 1),
+        _SECTION_LABEL_OPEN,
+        relevance_label,
+        _SECTION_SCORE_OPEN,
+        f"{relevance_score:.2f}",
+        _SECTION_BODY_OPEN,
+        chunk_text,
+        _SECTION_FOOT
+    ))
+
+
+def _format_chunks_for_prompt(chunks: List[Dict[str, Any]]) -> str:
+    """
+    🆕 Format chunks with metadata for better LLM context understanding
+    Includes: section markers, relevance scores, and structural context
+
+    Every chunk's pieces go into one parts list that is joined once.
+    """
+    parts: List[str] = []
+    for i, chunk in enumerate(chunks):
+        _append_chunk_parts(parts, chunk, i)
+    return "".join(parts)
+
+
+# 🆕 Embeddings of the constant strategy queries, computed once per worker
+_QUERY_VECTORS: Dict[str, Any] = {}
+
+
+def _get_query_vectors(queries: List[str]):
+    """
+    🆕 Return the precomputed embedding row for each query - a pure lookup, the
+    request path never runs the encoder itself.
+    Returns None if any query was not precomputed (e.g. the startup pass failed),
+    so retrieval embeds the queries off the event loop instead
+    """
+    try:
+        return [_QUERY_VECTORS[query] for query in queries]
+    except KeyError:
+        return None
+
+
+def precompute_query_vectors():
+    """🆕 Embed every ANALYSIS_QUERY_STRATEGIES query up front (called at startup)"""
+    queries = list(dict.fromkeys(
+        query
+        for strategy in ANALYSIS_QUERY_STRATEGIES.values()
+        for query in (strategy["primary"], *strategy["secondary"])
+    ))
+    try:
+        vectors = vector_service.create_embeddings(queries)
+    except Exception as e:
+        logger.warning(f"⚠️ Query embedding precompute failed: {str(e)}")
+        return
+    _QUERY_VECTORS.update(zip(queries, vectors))
+    logger.info("✅ Precomputed %d analysis query embeddings", len(_QUERY_VECTORS))
 
 
 async def _retrieve_multi_query_chunks(
@@ -69,51 +176,130 @@ async def _retrieve_multi_query_chunks(
     🆕 Multi-query retrieval strategy for comprehensive coverage
     Retrieves chunks using multiple related queries and deduplicates
     """
-    all_chunks = []
-    seen_chunk_ids = set()
+    # One insertion-ordered dict does the dedup: chunk_id -> chunk
+    chunks_by_id: Dict[Any, Dict[str, Any]] = {}
+    
+    # 🆕 One batched retrieval: the fixed strategy queries reuse their cached
+    # embeddings and are searched concurrently; results come back in query order
+    queries = [primary_query, *secondary_queries]
+    secondary_top_k = max(1, top_k // 2)  # Fewer chunks per secondary query
+    results = await vector_service.retrieve_relevant_chunks_batch(
+        queries=queries,
+        document_id=document_id,
+        top_ks=[top_k] + [secondary_top_k] * len(secondary_queries),
+        query_embeddings=_get_query_vectors(queries)
+    )
     
     # Primary query (most relevant)
-    try:
-        primary_chunks = await vector_service.retrieve_relevant_chunks(
-            query=primary_query,
-            document_id=document_id,
-            top_k=top_k
-        )
-        for chunk in primary_chunks:
+    primary_chunks = results[0]
+    for chunk in primary_chunks:
+        chunk_id = chunk.get('id')
+        if chunk_id not in chunks_by_id:
+            chunk['query_type'] = 'primary'
+            chunks_by_id[chunk_id] = chunk
+    
+    logger.info("🔍 Primary query retrieved %d chunks", len(primary_chunks))
+    
+    # Secondary queries (additional context), merged in query order
+    for i, secondary_chunks in enumerate(results[1:]):
+        seen_before = len(chunks_by_id)
+        for chunk in secondary_chunks:
             chunk_id = chunk.get('id')
-            if chunk_id not in seen_chunk_ids:
-                chunk['query_type'] = 'primary'
-                all_chunks.append(chunk)
-                seen_chunk_ids.add(chunk_id)
+            if chunk_id not in chunks_by_id:
+                chunk['query_type'] = f'secondary_{i+1}'
+                chunks_by_id[chunk_id] = chunk
         
-        logger.info(f"🔍 Primary query retrieved {len(primary_chunks)} chunks")
-    except Exception as e:
-        logger.warning(f"⚠️ Primary query failed: {str(e)}")
+        logger.info("🔍 Secondary query %d retrieved %d new chunks", i + 1, len(chunks_by_id) - seen_before)
     
-    # Secondary queries (additional context)
-    for i, secondary_query in enumerate(secondary_queries):
-        try:
-            secondary_chunks = await vector_service.retrieve_relevant_chunks(
-                query=secondary_query,
-                document_id=document_id,
-                top_k=max(1, top_k // 2)  # Fewer chunks per secondary query
-            )
-            for chunk in secondary_chunks:
-                chunk_id = chunk.get('id')
-                if chunk_id not in seen_chunk_ids:
-                    chunk['query_type'] = f'secondary_{i+1}'
-                    all_chunks.append(chunk)
-                    seen_chunk_ids.add(chunk_id)
-            
-            logger.info(f"🔍 Secondary query {i+1} retrieved {len([c for c in secondary_chunks if c.get('id') not in seen_chunk_ids])} new chunks")
-        except Exception as e:
-            logger.warning(f"⚠️ Secondary query {i+1} failed: {str(e)}")
+    all_chunks = list(chunks_by_id.values())
+    logger.info("✅ Total unique chunks retrieved: %d", len(all_chunks))
     
-    # Sort by relevance score (primary queries naturally score higher)
-    all_chunks.sort(key=lambda x: x.get('score', 0.0), reverse=True)
+    # Top-k by relevance score (primary queries naturally score higher): scores are
+    # read once into an array and ranked with a stable argsort instead of a lambda per compare
+    scores = np.fromiter((c.get('score', 0.0) for c in all_chunks), dtype=np.float32, count=len(all_chunks))
+    return [all_chunks[i] for i in np.argsort(-scores, kind='stable')[:top_k]]
+
+
+_RESPONSE_PREVIEW_CHARS = 300
+
+
+def _chunks_for_response(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    🆕 Trim chunk texts for the API response in one pass
+    The full text already went into the prompt; clients only need a preview
+    """
+    limit = _RESPONSE_PREVIEW_CHARS
+    trimmed = []
+    for chunk in chunks:
+        text = chunk.get('text', '')
+        if len(text) > limit:
+            chunk = {**chunk, 'text': text[:limit] + "..."}
+        trimmed.append(chunk)
+    return trimmed
+
+
+def _stream_analysis_response(payload: Dict[str, Any], chunks: List[Dict[str, Any]]) -> StreamingResponse:
+    """
+    🆕 Stream an analysis response as one JSON object
+    The payload fields are encoded up front, then relevant_chunks is emitted
+    chunk by chunk so large responses never sit fully encoded on the event loop
+    """
+    head = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
     
-    logger.info(f"✅ Total unique chunks retrieved: {len(all_chunks)}")
-    return all_chunks[:top_k]  # Return top-k most relevant
+    async def body():
+        yield head[:-1] + b',"relevant_chunks":['
+        for i, chunk in enumerate(chunks):
+            encoded = orjson.dumps(chunk, option=orjson.OPT_SERIALIZE_NUMPY)
+            yield b"," + encoded if i else encoded
+        yield b"]}"
+    
+    return StreamingResponse(body(), media_type="application/json")
+
+
+async def _embed_chunks_for_cache(chunks: List[Dict[str, Any]]):
+    """
+    🆕 Build a single document-level embedding for semantic cache lookups
+    Averages per-chunk embeddings so the whole retrieved context is represented,
+    not just the first 512 tokens the embedding model can see
+    """
+    texts = [" ".join(chunk.get('text', '').lower().split()) for chunk in chunks]
+    texts = [text for text in texts if text]
+    if not texts:
+        return None
+    try:
+        return (await vector_service.create_embeddings_async(texts)).mean(axis=0)
+    except Exception as e:
+        logger.warning(f"⚠️ Semantic cache embedding failed: {str(e)}")
+        return None
+
+
+def _strip_code_fence(text: str) -> str:
+    """
+    🆕 Return the body of the first ``` fenced block (language tag dropped),
+    or the text unchanged if there is no fence
+    """
+    start = text.find('```')
+    if start < 0:
+        return text
+    body_start = start + 3
+    if text.startswith('json', body_start):
+        body_start += 4
+    end = text.find('```', body_start)
+    return text[body_start:end] if end >= 0 else text[body_start:]
+
+
+# Raw responses longer than this skip the recovery cache (keeps its memory bounded)
+_RECOVERY_CACHE_MAX_CHARS = 64_000
+
+
+@functools.lru_cache(maxsize=512)
+def _recover_json_span(raw: str) -> Optional[str]:
+    """
+    🆕 Fence strip + brace scan, memoized on the raw LLM text
+    Retries and refresh storms often return identical strings; the span (a str)
+    is cached rather than the parsed dict, so every caller still gets a fresh dict
+    """
+    return extract_json_span(_strip_code_fence(raw))
 
 
 def _validate_and_repair_json(llm_response: Any) -> Dict[str, Any]:
@@ -127,23 +313,19 @@ def _validate_and_repair_json(llm_response: Any) -> Dict[str, Any]:
     if isinstance(llm_response, str):
         # Try direct parsing
         try:
-            return json.loads(llm_response)
+            return json_loads(llm_response)
         except json.JSONDecodeError:
             pass
         
-        # Try extracting JSON from markdown code blocks
-        json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', llm_response, re.DOTALL)
-        if json_match:
+        # Try extracting the first balanced JSON object (inside a markdown
+        # code block if there is one) with a single linear scan
+        if len(llm_response) > _RECOVERY_CACHE_MAX_CHARS:
+            json_span = _recover_json_span.__wrapped__(llm_response)
+        else:
+            json_span = _recover_json_span(llm_response)
+        if json_span:
             try:
-                return json.loads(json_match.group(1))
-            except json.JSONDecodeError:
-                pass
-        
-        # Try extracting any JSON object
-        json_match = re.search(r'\{.*\}', llm_response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(0))
+                return json_loads(json_span)
             except json.JSONDecodeError:
                 pass
     
@@ -159,37 +341,45 @@ def _verify_analysis_quality(analysis: Dict[str, Any], analysis_type: str) -> Di
     """
     quality_issues = []
     
+    # 🆕 Structural validation + defaults via the result model
+    result_model = ANALYSIS_RESULT_MODELS.get(analysis_type)
+    if result_model is not None:
+        try:
+            analysis = result_model.model_validate(analysis).model_dump()
+        except ValidationError as e:
+            analysis['_quality_warnings'] = ["Unexpected analysis structure - returned as-is"]
+            logger.warning(f"⚠️ Analysis structure validation failed: {e.error_count()} errors")
+            return analysis
+    
     if analysis_type == "risk":
         # Check for minimum risk identification
-        risks = analysis.get('risks', [])
-        if len(risks) < 2:
+        risks = analysis['risks']
+        risk_count = len(risks)
+        if risk_count < 2:
             quality_issues.append("Limited risk identification - may need manual review")
         
         # Check for risk score consistency
-        total_risks = analysis.get('total_risks', 0)
-        if len(risks) != total_risks:
-            analysis['total_risks'] = len(risks)
+        if risk_count != analysis['total_risks']:
+            analysis['total_risks'] = risk_count
             quality_issues.append("Risk count auto-corrected")
         
-        # Verify each risk has required fields
-        for risk in risks:
-            if not risk.get('title') or not risk.get('description'):
-                quality_issues.append("Some risks missing details")
-                break
+        # Verify each risk has required fields (any() stops at the first miss)
+        if any(not risk.get('title') or not risk.get('description') for risk in risks):
+            quality_issues.append("Some risks missing details")
     
     elif analysis_type == "summary":
         # Check for minimum summary length
-        summary = analysis.get('summary', '')
+        summary = analysis['summary']
         if len(summary) < 200:
             quality_issues.append("Summary appears brief - consider requesting more detail")
         
         # Check for key sections
-        if not analysis.get('key_points') or len(analysis.get('key_points', [])) < 3:
+        if len(analysis['key_points']) < 3:
             quality_issues.append("Limited key points identified")
     
     elif analysis_type == "negotiation":
         # Check for email completeness
-        emails = analysis.get('emails', {})
+        emails = analysis['emails']
         if not emails.get('acceptance') or not emails.get('rejection'):
             quality_issues.append("Email templates incomplete")
     
@@ -493,6 +683,111 @@ CONTRACT SECTIONS TO ANALYZE:
 Now, provide your comprehensive contract analysis:"""
 
 
+def _split_prompt_template(template: str) -> Tuple[str, str]:
+    """
+    🆕 Split a prompt template once around {formatted_chunks}
+    Resolves the {{ }} escapes so requests only need a string join
+    """
+    head, tail = template.split("{formatted_chunks}")
+    return (
+        head.replace("{{", "{").replace("}}", "}"),
+        tail.replace("{{", "{").replace("}}", "}")
+    )
+
+
+# Pre-split at import time: avoids re-parsing the multi-kB templates with .format() per request
+RISK_PROMPT_PARTS = _split_prompt_template(ENHANCED_RISK_PROMPT)
+NEGOTIATION_PROMPT_PARTS = _split_prompt_template(ENHANCED_NEGOTIATION_PROMPT)
+SUMMARY_PROMPT_PARTS = _split_prompt_template(ENHANCED_SUMMARY_PROMPT)
+
+# System messages for JSON enforcement (shared by the modular endpoints and /full-analysis)
+RISK_SYSTEM_MESSAGE = """You are a legal risk analyst. You MUST respond with valid JSON only. 
+No explanations before or after the JSON. Follow the exact format specified in the prompt."""
+
+NEGOTIATION_SYSTEM_MESSAGE = """You are a contract negotiation expert. You MUST respond with valid JSON only.
+Follow the exact format specified. Draft professional, diplomatic emails."""
+
+SUMMARY_SYSTEM_MESSAGE = """You are a legal document analyst. You MUST respond with valid JSON only.
+Provide comprehensive, detailed analysis. Follow the exact format specified."""
+
+# Multi-query retrieval strategy per analysis type (primary + secondary queries)
+ANALYSIS_QUERY_STRATEGIES = {
+    "risk": {
+        "primary": "legal risks liabilities penalties damages breach termination obligations compliance",
+        "secondary": [
+            "financial penalties service bond liquidated damages indemnification",
+            "termination notice period consequences breach conditions",
+            "confidentiality data protection regulatory compliance requirements"
+        ]
+    },
+    "negotiation": {
+        "primary": "compensation salary benefits payment terms obligations duties responsibilities",
+        "secondary": [
+            "termination notice period severance conditions",
+            "intellectual property rights ownership work product",
+            "non-compete non-solicitation restrictive covenants"
+        ]
+    },
+    "summary": {
+        "primary": "agreement contract terms parties obligations duties responsibilities scope purpose",
+        "secondary": [
+            "compensation payment financial terms amounts schedule",
+            "duration term timeline start date end date milestones",
+            "termination conditions notice requirements"
+        ]
+    }
+}
+
+
+# 🆕 Per-analysis-type endpoint configuration; each modular endpoint is built
+# from its entry at import time (see _make_analysis_endpoint)
+ANALYSIS_CONFIGS = {
+    "risk": {
+        "path": "/risk-analysis",
+        "name": "analyze_risks",
+        "label": "Risk analysis",
+        "start_message": "🎯 Starting Enhanced Risk Analysis for: %s",
+        "not_found_detail": "Document content not found. Please re-upload the file.",
+        "prompt_parts": RISK_PROMPT_PARTS,
+        "system_message": RISK_SYSTEM_MESSAGE,
+        "required_key": "risks"
+    },
+    "negotiation": {
+        "path": "/negotiation-assistant",
+        "name": "negotiation_assistant",
+        "label": "Negotiation analysis",
+        "start_message": "📧 Starting Enhanced Negotiation Analysis for: %s",
+        "not_found_detail": "Document content not found.",
+        "prompt_parts": NEGOTIATION_PROMPT_PARTS,
+        "system_message": NEGOTIATION_SYSTEM_MESSAGE,
+        "required_key": "emails"
+    },
+    "summary": {
+        "path": "/document-summary",
+        "name": "document_summary",
+        "label": "Document summary",
+        "start_message": "📄 Starting Enhanced Document Summary for: %s",
+        "not_found_detail": "Document content not found.",
+        "prompt_parts": SUMMARY_PROMPT_PARTS,
+        "system_message": SUMMARY_SYSTEM_MESSAGE,
+        "required_key": "summary"
+    }
+}
+
+# 🆕 UTF-8 encoded prompt head/tail and system message per analysis type, so the
+# cache key only has to encode the per-request chunk text
+ANALYSIS_PROMPT_BYTES = {
+    analysis_type: (
+        config["prompt_parts"][0].encode(),
+        config["prompt_parts"][1].encode(),
+        config["system_message"].encode()
+    )
+    for analysis_type, config in ANALYSIS_CONFIGS.items()
+}
+
+# Shared context size for /full-analysis after merging the per-type retrievals
+FULL_ANALYSIS_MAX_CHUNKS = 30
+
 # ============================================================================
 # ENHANCED HELPER FUNCTION (Existing Name, Completely Rewritten Logic)
 # ============================================================================
@@ -508,38 +803,17 @@ async def get_enhanced_comprehensive_chunks(
     Retrieves relevant chunks using multiple query strategies and formats
     them with metadata for optimal LLM understanding.
     """
+    # 🆕 Repeat requests for the same document and analysis type reuse the context
+    cache_key = (document_id, analysis_type)
+    cached = await retrieval_cache.get(cache_key)
+    if cached is not None:
+        logger.info("⚡ Retrieval cache hit for %s on doc: %s", analysis_type, document_id)
+        return cached
+    
     try:
-        logger.info(f"🔍 Enhanced retrieval for {analysis_type} on doc: {document_id}")
-        
-        # 🆕 Multi-query strategy based on analysis type
-        query_strategies = {
-            "risk": {
-                "primary": "legal risks liabilities penalties damages breach termination obligations compliance",
-                "secondary": [
-                    "financial penalties service bond liquidated damages indemnification",
-                    "termination notice period consequences breach conditions",
-                    "confidentiality data protection regulatory compliance requirements"
-                ]
-            },
-            "negotiation": {
-                "primary": "compensation salary benefits payment terms obligations duties responsibilities",
-                "secondary": [
-                    "termination notice period severance conditions",
-                    "intellectual property rights ownership work product",
-                    "non-compete non-solicitation restrictive covenants"
-                ]
-            },
-            "summary": {
-                "primary": "agreement contract terms parties obligations duties responsibilities scope purpose",
-                "secondary": [
-                    "compensation payment financial terms amounts schedule",
-                    "duration term timeline start date end date milestones",
-                    "termination conditions notice requirements"
-                ]
-            }
-        }
+        logger.info("🔍 Enhanced retrieval for %s on doc: %s", analysis_type, document_id)
         
-        strategy = query_strategies.get(analysis_type, {
+        strategy = ANALYSIS_QUERY_STRATEGIES.get(analysis_type, {
             "primary": "contract agreement terms conditions",
             "secondary": ["obligations responsibilities", "terms conditions"]
         })
@@ -556,14 +830,12 @@ async def get_enhanced_comprehensive_chunks(
             logger.warning(f"⚠️ No chunks retrieved for {document_id}")
             return "", []
         
-        logger.info(f"✅ Retrieved {len(chunks)} chunks for {analysis_type} analysis")
+        logger.info("✅ Retrieved %d chunks for %s analysis", len(chunks), analysis_type)
         
         # 🆕 Format chunks with metadata for better LLM understanding
-        formatted_chunks = "\n\n".join([
-            _format_chunk_with_metadata(chunk, i) 
-            for i, chunk in enumerate(chunks)
-        ])
+        formatted_chunks = _format_chunks_for_prompt(chunks)
         
+        await retrieval_cache.put(cache_key, (formatted_chunks, chunks))
         return formatted_chunks, chunks
         
     except Exception as e:
@@ -571,198 +843,316 @@ async def get_enhanced_comprehensive_chunks(
         raise HTTPException(status_code=500, detail=f"Retrieval failed: {str(e)}")
 
 
+# ============================================================================
+# SHARED ANALYSIS PIPELINE
+# ============================================================================
+
+# Above these sizes JSON repair / quality verification run in a worker thread;
+# smaller payloads are cheaper to handle inline than to hand off
+_OFFLOAD_REPAIR_CHARS = 10_000
+_OFFLOAD_VERIFY_ITEMS = 40
+
+
+def _result_item_count(result: Dict[str, Any]) -> int:
+    """Top-level list/dict entries in an analysis result (rough verification cost)"""
+    return sum(len(value) for value in result.values() if isinstance(value, (list, dict)))
+
+
+# In-flight LLM analyses keyed by exact-prompt cache key
+_analysis_flights = SingleFlight()
+
+
+async def _generate_analysis(
+    formatted_chunks: str,
+    prompt_parts: Tuple[str, str],
+    system_message: str,
+    required_key: str,
+    cache_key: str,
+    cache_namespace: Tuple[str, str, str],
+    cache_vector
+) -> Dict[str, Any]:
+    """🆕 Cache-miss path: prompt build + LLM → JSON repair → fallback, then fill both cache tiers"""
+    prompt = "".join((prompt_parts[0], formatted_chunks, prompt_parts[1]))
+    llm_response = await llm_service.call_groq_queued(prompt, system_message, json_mode=True, stream=True)
+
+    # 🆕 Validate and repair JSON response (off the event loop for large raw text)
+    if isinstance(llm_response, str) and len(llm_response) > _OFFLOAD_REPAIR_CHARS:
+        analysis_result = await asyncio.to_thread(_validate_and_repair_json, llm_response)
+    else:
+        analysis_result = _validate_and_repair_json(llm_response)
+
+    # 🆕 Use fallback analysis if the LLM call failed
+    if "error" in analysis_result and required_key not in analysis_result:
+        analysis_result = llm_response.get("fallback_analysis", analysis_result)
+    elif "error" not in analysis_result:
+        semantic_cache.put(cache_namespace, cache_vector, analysis_result)
+        await llm_cache.set(cache_key, analysis_result)
+    return analysis_result
+
+
+async def _run_analysis(
+    analysis_type: str,
+    session_document_id: str,
+    formatted_chunks: str,
+    chunks: List[Dict[str, Any]],
+    jurisdiction: str,
+    cache_vector=None
+) -> Dict[str, Any]:
+    """
+    🆕 Shared analysis flow used by the modular endpoints and /full-analysis
+    Exact cache → semantic cache → single-flight LLM call → JSON repair → quality check
+    Prompt, system message and required key come from ANALYSIS_CONFIGS[analysis_type]
+    """
+    config = ANALYSIS_CONFIGS[analysis_type]
+    prompt_parts = config["prompt_parts"]
+    system_message = config["system_message"]
+    required_key = config["required_key"]
+
+    # 🆕 Exact-prompt cache (Redis, shared across workers)
+    head_bytes, tail_bytes, system_bytes = ANALYSIS_PROMPT_BYTES[analysis_type]
+    cache_key = llm_cache.make_key_from_parts(
+        (head_bytes, formatted_chunks.encode(), tail_bytes),
+        system_bytes
+    )
+    analysis_result = await llm_cache.get(cache_key)
+
+    # 🆕 Semantic cache lookup (a near-identical context of the same document skips the
+    # LLM call); scoped to the caller's document so no other user's analysis is returned
+    cache_namespace = (session_document_id, analysis_type, jurisdiction)
+    if analysis_result is None:
+        if cache_vector is None:
+            cache_vector = await _embed_chunks_for_cache(chunks)
+        analysis_result = semantic_cache.get(cache_namespace, cache_vector)
+
+    if analysis_result is None:
+        # 🆕 Single-flight: concurrent requests for the same prompt share one LLM call
+        analysis_result, joined = await _analysis_flights.run(cache_key, lambda: _generate_analysis(
+            formatted_chunks, prompt_parts, system_message, required_key,
+            cache_key, cache_namespace, cache_vector
+        ))
+        if joined:
+            logger.info("⏳ Reused in-flight %s analysis: %s", analysis_type, cache_key[:12])
+            analysis_result = copy.deepcopy(analysis_result)
+
+    # 🆕 Post-processing validation (model validation is per item, so big results go to a thread)
+    if _result_item_count(analysis_result) > _OFFLOAD_VERIFY_ITEMS:
+        return await asyncio.to_thread(_verify_analysis_quality, analysis_result, analysis_type)
+    return _verify_analysis_quality(analysis_result, analysis_type)
+
+
 # ============================================================================
 # API ENDPOINTS (Names Preserved, Logic Enhanced)
 # ============================================================================
 
-@router.post("/risk-analysis", response_model=AnalysisResponse)
-async def analyze_risks(
-    request: AnalysisRequest,
-    current_session: dict = Depends(get_current_session)
-):
+def _make_analysis_endpoint(analysis_type: str):
     """
-    ✅ ENDPOINT NAME PRESERVED: /risk-analysis
-    ✅ FUNCTION NAME PRESERVED: analyze_risks
-    🔧 LOGIC COMPLETELY REWRITTEN for enhanced accuracy
+    🆕 Build one modular analysis endpoint from its ANALYSIS_CONFIGS entry
+    Config values are bound as closure constants once at import time
     """
-    try:
+    config = ANALYSIS_CONFIGS[analysis_type]
+    label = config["label"]
+    start_message = config["start_message"]
+    not_found_detail = config["not_found_detail"]
+    
+    async def endpoint(
+        request: AnalysisRequest,
+        current_session: dict = Depends(get_current_session)
+    ):
         session_id = current_session["session_id"]
         session_document_id = f"{session_id}_{request.document_id}"
         
-        logger.info(f"🎯 Starting Enhanced Risk Analysis for: {session_document_id}")
+        logger.info(start_message, session_document_id)
         
         # 🔧 Use enhanced retrieval (same function name, new logic)
         formatted_chunks, chunks = await get_enhanced_comprehensive_chunks(
             session_document_id, 
-            "risk"
+            analysis_type
         )
         
         if not formatted_chunks.strip():
             raise HTTPException(
                 status_code=404, 
-                detail="Document content not found. Please re-upload the file."
+                detail=not_found_detail
             )
         
-        # 🆕 Use enhanced prompt with formatted chunks
-        prompt = ENHANCED_RISK_PROMPT.format(formatted_chunks=formatted_chunks)
-        
-        # 🆕 Add system message for JSON enforcement
-        system_message = """You are a legal risk analyst. You MUST respond with valid JSON only. 
-No explanations before or after the JSON. Follow the exact format specified in the prompt."""
-        
-        # Call LLM with enhanced prompt
-        llm_response = await llm_service.call_groq(prompt, system_message)
-        
-        # 🆕 Validate and repair JSON response
-        analysis_result = _validate_and_repair_json(llm_response)
-        
-        # 🆕 Check for errors in response
-        if "error" in analysis_result and "risks" not in analysis_result:
-            # Use fallback if available
-            analysis_result = llm_response.get("fallback_analysis", analysis_result)
-        
-        # 🆕 Post-processing validation
-        analysis_result = _verify_analysis_quality(analysis_result, "risk")
+        # 🆕 Shared pipeline: cached or fresh LLM analysis with JSON repair
+        # (retrieval above raises its own HTTPException, so only this step is guarded)
+        try:
+            analysis_result = await _run_analysis(
+                analysis_type,
+                session_document_id,
+                formatted_chunks,
+                chunks,
+                request.jurisdiction
+            )
+        except Exception as e:
+            logger.error(f"❌ {label} failed: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
         
-        logger.info(f"✅ Risk analysis completed: {analysis_result.get('total_risks', 0)} risks identified")
+        logger.info("✅ %s completed", label)
         
-        return AnalysisResponse(
-            analysis=analysis_result,
-            relevant_chunks=chunks,
-            status="success",
-            timestamp=datetime.now().isoformat(),
-            session_id=session_id
+        # 🆕 Streamed as JSON; the body matches AnalysisResponse
+        return _stream_analysis_response(
+            {
+                "analysis": analysis_result,
+                "status": "success",
+                "timestamp": now_iso(),
+                "session_id": session_id
+            },
+            _chunks_for_response(chunks)
         )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Risk analysis failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    
+    endpoint.__name__ = endpoint.__qualname__ = config["name"]
+    endpoint.__doc__ = f"""
+    ✅ ENDPOINT NAME PRESERVED: {config["path"]}
+    ✅ FUNCTION NAME PRESERVED: {config["name"]}
+    🔧 Built from ANALYSIS_CONFIGS["{analysis_type}"]
+    """
+    return router.post(config["path"], response_model=AnalysisResponse)(endpoint)
 
 
-@router.post("/negotiation-assistant", response_model=AnalysisResponse)
-async def negotiation_assistant(
+analyze_risks = _make_analysis_endpoint("risk")
+negotiation_assistant = _make_analysis_endpoint("negotiation")
+document_summary = _make_analysis_endpoint("summary")
+
+
+@router.post("/full-analysis", response_model=FullAnalysisResponse)
+async def full_analysis(
     request: AnalysisRequest,
     current_session: dict = Depends(get_current_session)
 ):
     """
-    ✅ ENDPOINT NAME PRESERVED: /negotiation-assistant
-    ✅ FUNCTION NAME PRESERVED: negotiation_assistant
-    🔧 LOGIC COMPLETELY REWRITTEN for better email generation
+    🆕 Risk, negotiation and summary analyses in one request
+    The three primary queries are retrieved in one batched call, merged into one
+    deduplicated context, and fed to three concurrent LLM calls, so wall-clock
+    time is roughly one LLM round-trip instead of three
     """
-    try:
-        session_id = current_session["session_id"]
-        session_document_id = f"{session_id}_{request.document_id}"
-        
-        logger.info(f"📧 Starting Enhanced Negotiation Analysis for: {session_document_id}")
-        
-        # 🔧 Enhanced retrieval
-        formatted_chunks, chunks = await get_enhanced_comprehensive_chunks(
-            session_document_id, 
-            "negotiation"
-        )
-        
-        if not formatted_chunks.strip():
-            raise HTTPException(
-                status_code=404, 
-                detail="Document content not found."
-            )
-        
-        # 🆕 Enhanced prompt
-        prompt = ENHANCED_NEGOTIATION_PROMPT.format(formatted_chunks=formatted_chunks)
-        
-        system_message = """You are a contract negotiation expert. You MUST respond with valid JSON only.
-Follow the exact format specified. Draft professional, diplomatic emails."""
-        
-        llm_response = await llm_service.call_groq(prompt, system_message)
-        
-        # 🆕 Validate and repair
-        analysis_result = _validate_and_repair_json(llm_response)
-        
-        if "error" in analysis_result and "emails" not in analysis_result:
-            analysis_result = llm_response.get("fallback_analysis", analysis_result)
-        
-        # 🆕 Quality check
-        analysis_result = _verify_analysis_quality(analysis_result, "negotiation")
-        
-        logger.info(f"✅ Negotiation analysis completed")
-        
-        return AnalysisResponse(
-            analysis=analysis_result,
-            relevant_chunks=chunks,
-            status="success",
-            timestamp=datetime.now().isoformat(),
-            session_id=session_id
+    session_id = current_session["session_id"]
+    session_document_id = f"{session_id}_{request.document_id}"
+    
+    logger.info("🧩 Starting Full Analysis for: %s", session_document_id)
+    
+    # 🆕 Cached query embeddings, concurrent Pinecone searches (one primary query per analysis type)
+    analysis_types = tuple(ANALYSIS_CONFIGS)
+    primary_queries = [ANALYSIS_QUERY_STRATEGIES[analysis_type]["primary"] for analysis_type in analysis_types]
+    retrieved = await vector_service.retrieve_relevant_chunks_batch(
+        queries=primary_queries,
+        document_id=session_document_id,
+        top_ks=[20] * len(primary_queries),
+        query_embeddings=_get_query_vectors(primary_queries)
+    )
+    
+    # 🆕 Deduplicate overlapping retrievals by chunk_index so each section enters
+    # the shared prompt context once, keeping the best-scoring copy
+    unique_chunks: Dict[Any, Dict[str, Any]] = {}
+    for chunk in (chunk for query_chunks in retrieved for chunk in query_chunks):
+        existing = unique_chunks.get(chunk["chunk_index"])
+        if existing is None or chunk.get("score", 0.0) > existing.get("score", 0.0):
+            unique_chunks[chunk["chunk_index"]] = chunk
+    
+    if not unique_chunks:
+        raise HTTPException(
+            status_code=404, 
+            detail="Document content not found. Please re-upload the file."
         )
-        
-    except HTTPException:
-        raise
+    
+    # Same context budget as a single broad retrieval, best match first (the prompts
+    # present their sections ranked by relevance, like the per-analysis endpoints)
+    chunks = sorted(unique_chunks.values(), key=lambda c: c.get("score", 0.0), reverse=True)[:FULL_ANALYSIS_MAX_CHUNKS]
+    
+    formatted_chunks = _format_chunks_for_prompt(chunks)
+    cache_vector = await _embed_chunks_for_cache(chunks)
+    
+    try:
+        results = await asyncio.gather(*(
+            _run_analysis(analysis_type, session_document_id, formatted_chunks, chunks, request.jurisdiction, cache_vector)
+            for analysis_type in analysis_types
+        ))
     except Exception as e:
-        logger.error(f"❌ Negotiation analysis failed: {str(e)}")
+        logger.error(f"❌ Full analysis failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.post("/document-summary", response_model=AnalysisResponse)
-async def document_summary(
+    
+    logger.info("✅ Full analysis completed over %d chunks", len(chunks))
+    
+    # 🆕 Streamed as JSON; the body matches FullAnalysisResponse
+    return _stream_analysis_response(
+        {
+            "analyses": dict(zip(analysis_types, results)),
+            "status": "success",
+            "timestamp": now_iso(),
+            "session_id": session_id
+        },
+        _chunks_for_response(chunks)
+    )
+
+
+@router.post("/analyze-all", response_model=FullAnalysisResponse)
+async def analyze_all(
     request: AnalysisRequest,
     current_session: dict = Depends(get_current_session)
 ):
     """
-    ✅ ENDPOINT NAME PRESERVED: /document-summary
-    ✅ FUNCTION NAME PRESERVED: document_summary
-    🔧 LOGIC COMPLETELY REWRITTEN for comprehensive analysis
+    🆕 Combined view with each analysis on its own tailored context
+    Unlike /full-analysis (one merged context), every analysis type keeps its
+    multi-query retrieval; the retrievals and then the LLM calls run concurrently,
+    so clients pay about one round-trip instead of calling the three endpoints in turn
     """
-    try:
-        session_id = current_session["session_id"]
-        session_document_id = f"{session_id}_{request.document_id}"
-        
-        logger.info(f"📄 Starting Enhanced Document Summary for: {session_document_id}")
-        
-        # 🔧 Enhanced retrieval
-        formatted_chunks, chunks = await get_enhanced_comprehensive_chunks(
-            session_document_id, 
-            "summary"
+    session_id = current_session["session_id"]
+    session_document_id = f"{session_id}_{request.document_id}"
+    
+    logger.info("🧩 Starting Analyze-All for: %s", session_document_id)
+    
+    # 🆕 Concurrent retrievals (each goes through the retrieval cache)
+    analysis_types = tuple(ANALYSIS_CONFIGS)
+    contexts = dict(zip(analysis_types, await asyncio.gather(*(
+        get_enhanced_comprehensive_chunks(session_document_id, analysis_type)
+        for analysis_type in analysis_types
+    ))))
+    
+    ready_types = [t for t in analysis_types if contexts[t][0].strip()]
+    if not ready_types:
+        raise HTTPException(
+            status_code=404, 
+            detail="Document content not found. Please re-upload the file."
         )
-        
-        if not formatted_chunks.strip():
-            raise HTTPException(
-                status_code=404, 
-                detail="Document content not found."
+    
+    # 🆕 Concurrent LLM calls, one per analysis type with its own context
+    try:
+        results = await asyncio.gather(*(
+            _run_analysis(
+                analysis_type, session_document_id,
+                contexts[analysis_type][0], contexts[analysis_type][1], request.jurisdiction
             )
-        
-        # 🆕 Enhanced prompt
-        prompt = ENHANCED_SUMMARY_PROMPT.format(formatted_chunks=formatted_chunks)
-        
-        system_message = """You are a legal document analyst. You MUST respond with valid JSON only.
-Provide comprehensive, detailed analysis. Follow the exact format specified."""
-        
-        llm_response = await llm_service.call_groq(prompt, system_message)
-        
-        # 🆕 Validate and repair
-        analysis_result = _validate_and_repair_json(llm_response)
-        
-        if "error" in analysis_result and "summary" not in analysis_result:
-            analysis_result = llm_response.get("fallback_analysis", analysis_result)
-        
-        # 🆕 Quality check
-        analysis_result = _verify_analysis_quality(analysis_result, "summary")
-        
-        logger.info(f"✅ Document summary completed")
-        
-        return AnalysisResponse(
-            analysis=analysis_result,
-            relevant_chunks=chunks,
-            status="success",
-            timestamp=datetime.now().isoformat(),
-            session_id=session_id
-        )
-        
-    except HTTPException:
-        raise
+            for analysis_type in ready_types
+        ))
     except Exception as e:
-        logger.error(f"❌ Document summary failed: {str(e)}")
+        logger.error(f"❌ Analyze-all failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    analyses = {
+        analysis_type: {"error": ANALYSIS_CONFIGS[analysis_type]["not_found_detail"]}
+        for analysis_type in analysis_types
+    }
+    analyses.update(zip(ready_types, results))
+    
+    # Union of the contexts, one copy per section, in document order
+    unique_chunks: Dict[Any, Dict[str, Any]] = {}
+    for analysis_type in ready_types:
+        for chunk in contexts[analysis_type][1]:
+            unique_chunks.setdefault(chunk["chunk_index"], chunk)
+    chunks = sorted(unique_chunks.values(), key=lambda c: c["chunk_index"])
+    
+    logger.info("✅ Analyze-all completed (%d analyses)", len(ready_types))
+    
+    return _stream_analysis_response(
+        {
+            "analyses": analyses,
+            "status": "success",
+            "timestamp": now_iso(),
+            "session_id": session_id
+        },
+        _chunks_for_response(chunks)
+    )
 
 
 # Export the router (unchanged)
@@ -1,6 +1,11 @@
 # app/api/auth.py
+import asyncio
+import hashlib
 import logging
 import os
+import time
+from collections import OrderedDict
+from typing import Tuple
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
@@ -13,42 +18,55 @@ logger = logging.getLogger(__name__)
 security = HTTPBearer()
 
 # --- 1. Firebase Initialization ---
-# We ensure Firebase is initialized only once to avoid errors
-try:
-    if not firebase_admin._apps:
-        # Strategy 1: Try Environment Variables (Render/Cloud Deployment)
-        if settings.FIREBASE_PROJECT_ID and settings.FIREBASE_PRIVATE_KEY and settings.FIREBASE_CLIENT_EMAIL:
-            # Handle private key formatting (restore newlines if they were escaped)
-            private_key = settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n')
-            
-            cred_dict = {
-                "type": "service_account",
-                "project_id": settings.FIREBASE_PROJECT_ID,
-                "private_key_id": "obtained-from-env",
-                "private_key": private_key,
-                "client_email": settings.FIREBASE_CLIENT_EMAIL,
-                "client_id": "obtained-from-env",
-                "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-                "token_uri": "https://oauth2.googleapis.com/token",
-                "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-                "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{settings.FIREBASE_CLIENT_EMAIL}"
-            }
-            cred = credentials.Certificate(cred_dict)
-            firebase_admin.initialize_app(cred)
-            logger.info("✅ Firebase initialized using Environment Variables.")
-            
-        # Strategy 2: Try Local JSON File (Local Development)
-        else:
-            cred_path = os.path.join(os.getcwd(), "firebase-service-account.json")
-            if os.path.exists(cred_path):
-                cred = credentials.Certificate(cred_path)
-                firebase_admin.initialize_app(cred)
-                logger.info(f"✅ Firebase initialized using JSON file: {cred_path}")
-            else:
-                logger.warning("⚠️ Firebase credentials not found. Authentication will fail.")
-
-except Exception as e:
-    logger.error(f"❌ Failed to initialize Firebase: {str(e)}")
+
+def _firebase_credentials():
+    """Service-account credentials from env vars (Render/Cloud) or a local JSON file; None if neither"""
+    # Strategy 1: Try Environment Variables (Render/Cloud Deployment)
+    if settings.FIREBASE_PROJECT_ID and settings.FIREBASE_PRIVATE_KEY and settings.FIREBASE_CLIENT_EMAIL:
+        # Handle private key formatting (restore newlines if they were escaped)
+        private_key = settings.FIREBASE_PRIVATE_KEY.replace('\\n', '\n')
+        
+        cred_dict = {
+            "type": "service_account",
+            "project_id": settings.FIREBASE_PROJECT_ID,
+            "private_key_id": "obtained-from-env",
+            "private_key": private_key,
+            "client_email": settings.FIREBASE_CLIENT_EMAIL,
+            "client_id": "obtained-from-env",
+            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+            "token_uri": "https://oauth2.googleapis.com/token",
+            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
+            "client_x509_cert_url": f"https://www.googleapis.com/robot/v1/metadata/x509/{settings.FIREBASE_CLIENT_EMAIL}"
+        }
+        logger.info("✅ Firebase credentials loaded from Environment Variables.")
+        return credentials.Certificate(cred_dict)
+    
+    # Strategy 2: Try Local JSON File (Local Development)
+    cred_path = os.path.join(os.getcwd(), "firebase-service-account.json")
+    if os.path.exists(cred_path):
+        logger.info(f"✅ Firebase credentials loaded from JSON file: {cred_path}")
+        return credentials.Certificate(cred_path)
+    
+    return None
+
+
+def init_firebase():
+    """
+    Initialize the Firebase app once per process (FastAPI startup hook).
+    Blocking (parses the service-account key), so startup runs it in a thread;
+    calling it again is a no-op.
+    """
+    if firebase_admin._apps:
+        return
+    try:
+        cred = _firebase_credentials()
+        if cred is None:
+            logger.warning("⚠️ Firebase credentials not found. Authentication will fail.")
+            return
+        firebase_admin.initialize_app(cred)
+        logger.info("✅ Firebase initialized.")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Firebase: {str(e)}")
 
 # --- 2. Models ---
 class TokenVerificationResponse(BaseModel):
@@ -63,15 +81,55 @@ class LoginRequest(BaseModel):
 
 # --- 3. Dependencies ---
 
+# Verified tokens are reused until they expire, but for at most
+# _REVOCATION_RECHECK_SECONDS, so a revoked token stops working within that window
+_TOKEN_CACHE_MAX = 10_000
+_REVOCATION_RECHECK_SECONDS = 300
+# blake2b(token) -> (reuse_until epoch seconds, decoded token)
+_token_cache: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _get_cached_token(key: bytes) -> dict | None:
+    entry = _token_cache.get(key)
+    if entry is None:
+        return None
+    reuse_until, decoded_token = entry
+    if time.time() >= reuse_until:
+        del _token_cache[key]
+        return None
+    _token_cache.move_to_end(key)
+    return decoded_token
+
+
+def _cache_token(key: bytes, decoded_token: dict):
+    now = time.time()
+    reuse_until = min(decoded_token.get("exp", now), now + _REVOCATION_RECHECK_SECONDS)
+    _token_cache[key] = (reuse_until, decoded_token)
+    _token_cache.move_to_end(key)
+    while len(_token_cache) > _TOKEN_CACHE_MAX:
+        _token_cache.popitem(last=False)
+
+
 async def verify_firebase_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """
     Validates the Bearer token sent by the frontend against Firebase.
     Returns the decoded token (user info) if valid.
+    Verified tokens are served from an in-process cache (see _REVOCATION_RECHECK_SECONDS).
     """
     token = credentials.credentials
+    cache_key = _token_cache_key(token)
+    decoded_token = _get_cached_token(cache_key)
+    if decoded_token is not None:
+        return decoded_token
     try:
         # Verify the ID token while checking if the token is revoked
-        decoded_token = auth.verify_id_token(token, check_revoked=True)
+        # (firebase_admin is blocking: RSA verify, key fetch and revocation RPC run in a thread)
+        decoded_token = await asyncio.to_thread(auth.verify_id_token, token, check_revoked=True)
+        _cache_token(cache_key, decoded_token)
         return decoded_token
     except auth.RevokedIdTokenError:
         logger.error("❌ Token revoked")
@@ -108,7 +166,7 @@ async def get_current_session(decoded_token: dict = Depends(verify_firebase_toke
 @router.post("/login", response_model=TokenVerificationResponse)
 async def login(request: LoginRequest):
     try:
-        decoded_token = auth.verify_id_token(request.id_token)
+        decoded_token = await asyncio.to_thread(auth.verify_id_token, request.id_token)
         return TokenVerificationResponse(
             valid=True,
             uid=decoded_token.get("uid"),
@@ -2,21 +2,43 @@
 # ✨ PHASE 2A: Enhanced Conversational RAG with Multi-Turn Context
 # ✅ NO BREAKING CHANGES: All route names and function signatures preserved
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Deque
+from collections import deque
+from itertools import islice
+import asyncio
+import bisect
+import functools
+import hashlib
 import logging
+import time
 from datetime import datetime
 import re
 
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional - conversations stay in worker memory
+    aioredis = None
+
 # Services
 from app.services.vector_service import vector_service
 from app.services.llm_service import llm_service
+from app.services.retrieval_cache import chat_retrieval_cache
+from app.utils.single_flight import SingleFlight
+from app.utils.time_utils import now_iso
 from app.api.auth import get_current_session
+from app.config import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# System message for chat completions (constant across requests)
+CHAT_SYSTEM_MESSAGE = "You are Accord AI, a legal document analysis expert. Follow all instructions precisely."
+
 
 # ============================================================================
 # MODELS (UNCHANGED - Preserved for API Compatibility)
@@ -58,31 +80,46 @@ class SimpleConversationStore:
     🆕 Lightweight in-memory conversation storage
     Stores conversation history per session for context-aware responses
     """
-    def __init__(self):
-        self.conversations: Dict[str, List[Dict[str, Any]]] = {}
-        self.max_history_per_session = 20  # Keep last 20 messages
+    def __init__(self, max_history_per_session: int = 20):
+        # Ring buffer per session: appending past the cap evicts the oldest message in O(1)
+        self.conversations: Dict[str, Deque[Dict[str, Any]]] = {}
+        self.max_history_per_session = max_history_per_session  # Keep last 20 messages by default
     
-    def add_message(self, session_id: str, role: str, content: str, document_id: Optional[str] = None):
-        """Add a message to conversation history"""
-        if session_id not in self.conversations:
-            self.conversations[session_id] = []
-        
-        message = {
+    @staticmethod
+    def _make_message(role: str, content: str, document_id: Optional[str], timestamp: str) -> Dict[str, Any]:
+        return {
             "role": role,  # 'user' or 'assistant'
             "content": content,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "document_id": document_id
         }
+    
+    def add_message(self, session_id: str, role: str, content: str, document_id: Optional[str] = None):
+        """Add a message to conversation history"""
+        self.add_messages(session_id, [{"role": role, "content": content}], document_id)
+    
+    def add_messages(self, session_id: str, messages: List[Dict[str, str]], document_id: Optional[str] = None):
+        """🆕 Add several {"role", "content"} messages (e.g. a whole chat turn) at once"""
+        history = self.conversations.get(session_id)
+        if history is None:
+            history = self.conversations[session_id] = deque(maxlen=self.max_history_per_session)
         
-        self.conversations[session_id].append(message)
-        
-        # Keep only recent messages
-        if len(self.conversations[session_id]) > self.max_history_per_session:
-            self.conversations[session_id] = self.conversations[session_id][-self.max_history_per_session:]
+        timestamp = datetime.now().isoformat()
+        # deque(maxlen) keeps only recent messages
+        history.extend(
+            self._make_message(message["role"], message["content"], document_id, timestamp)
+            for message in messages
+        )
     
     def get_history(self, session_id: str, last_n: int = 10) -> List[Dict[str, Any]]:
         """Get recent conversation history"""
-        return self.conversations.get(session_id, [])[-last_n:]
+        history = self.conversations.get(session_id)
+        if not history:
+            return []
+        # The deque is already trimmed at write time; only a short tail is copied out
+        if last_n >= len(history):
+            return list(history)
+        return list(islice(history, len(history) - last_n, None))
     
     def clear_history(self, session_id: str):
         """Clear conversation history"""
@@ -103,42 +140,197 @@ class SimpleConversationStore:
             "documents_discussed": list(set(m.get("document_id") for m in messages if m.get("document_id")))
         }
 
+
+# ============================================================================
+# REDIS CONVERSATION STORE (Shared Across Workers)
+# ============================================================================
+
+class RedisConversationStore:
+    """
+    🆕 Conversation history in Redis lists (one per session, capped and expiring)
+    so every uvicorn worker sees the same turns. Same interface as
+    SimpleConversationStore, but async; while Redis is unavailable the
+    in-memory store is used instead (same circuit breaker as the LLM cache).
+    """
+    def __init__(self, redis_url: str, ttl: int = 3600, max_history_per_session: int = 20, retry_after: float = 30.0):
+        self.ttl = ttl
+        self.max_history_per_session = max_history_per_session
+        self.retry_after = retry_after
+        self._disabled_until = 0.0
+        self.fallback = SimpleConversationStore(max_history_per_session)
+        self.client = None
+        
+        if aioredis is None:
+            logger.warning("⚠️ redis package not installed - conversation history kept per worker")
+            return
+        try:
+            # One pooled client per worker
+            self.client = aioredis.from_url(
+                redis_url,
+                max_connections=50,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5
+            )
+            logger.info("✅ Conversation store configured with Redis")
+        except Exception as e:
+            logger.warning(f"⚠️ Redis conversation store disabled: {str(e)}")
+    
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"conv:{session_id}"
+    
+    def _available(self) -> bool:
+        return self.client is not None and time.monotonic() >= self._disabled_until
+    
+    def _trip(self, error: Exception):
+        self._disabled_until = time.monotonic() + self.retry_after
+        logger.warning(f"⚠️ Redis conversation store unavailable, using worker memory for {self.retry_after:.0f}s: {str(error)}")
+    
+    async def add_message(self, session_id: str, role: str, content: str, document_id: Optional[str] = None):
+        """Add a message to conversation history"""
+        await self.add_messages(session_id, [{"role": role, "content": content}], document_id)
+    
+    async def add_messages(self, session_id: str, messages: List[Dict[str, str]], document_id: Optional[str] = None):
+        """🆕 Add several {"role", "content"} messages (e.g. a whole chat turn) in one round trip"""
+        if not self._available():
+            return self.fallback.add_messages(session_id, messages, document_id)
+        
+        timestamp = datetime.now().isoformat()
+        key = self._key(session_id)
+        try:
+            # Append all, keep only recent messages, refresh expiry: one round trip
+            pipe = self.client.pipeline(transaction=False)
+            pipe.rpush(key, *(
+                orjson.dumps(SimpleConversationStore._make_message(message["role"], message["content"], document_id, timestamp))
+                for message in messages
+            ))
+            pipe.ltrim(key, -self.max_history_per_session, -1)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+        except Exception as e:
+            self._trip(e)
+            self.fallback.add_messages(session_id, messages, document_id)
+    
+    async def get_history(self, session_id: str, last_n: int = 10) -> List[Dict[str, Any]]:
+        """Get recent conversation history"""
+        if not self._available():
+            return self.fallback.get_history(session_id, last_n)
+        try:
+            raw_messages = await self.client.lrange(self._key(session_id), -last_n, -1)
+        except Exception as e:
+            self._trip(e)
+            return self.fallback.get_history(session_id, last_n)
+        return [orjson.loads(raw) for raw in raw_messages]
+    
+    async def clear_history(self, session_id: str):
+        """Clear conversation history"""
+        self.fallback.clear_history(session_id)
+        if not self._available():
+            return
+        try:
+            await self.client.delete(self._key(session_id))
+        except Exception as e:
+            self._trip(e)
+    
+    async def get_summary(self, session_id: str) -> Dict[str, Any]:
+        """Get conversation summary"""
+        if not self._available():
+            return self.fallback.get_summary(session_id)
+        try:
+            # Lists are capped at max_history_per_session, so reading them whole is cheap
+            raw_messages = await self.client.lrange(self._key(session_id), 0, -1)
+        except Exception as e:
+            self._trip(e)
+            return self.fallback.get_summary(session_id)
+        if not raw_messages:
+            return {"message_count": 0, "exists": False}
+        
+        messages = [orjson.loads(raw) for raw in raw_messages]
+        return {
+            "message_count": len(messages),
+            "exists": True,
+            "first_message_time": messages[0]["timestamp"],
+            "last_message_time": messages[-1]["timestamp"],
+            "documents_discussed": list(set(m.get("document_id") for m in messages if m.get("document_id")))
+        }
+
 # Global conversation store
-conversation_store = SimpleConversationStore()
+conversation_store = RedisConversationStore(settings.REDIS_URL)
 
 
 # ============================================================================
 # NEW HELPER FUNCTIONS (Added for Enhanced Chatbot RAG)
 # ============================================================================
 
+# Question-type keywords in priority order, compiled into ONE pattern so a question is
+# scanned once for every category (plain substring match, like the original `word in
+# text` checks). The alternation sits in a lookahead so matches may overlap and a
+# lower-priority keyword can never consume the text of a higher-priority one
+_QUESTION_TYPE_KEYWORDS = (
+    ("factual", ('what is', 'define', 'explain', 'who', 'when', 'where')),          # Factual/specific questions
+    ("comparative", ('compare', 'difference', 'better', 'versus', 'vs')),           # Comparative questions
+    ("risk_analysis", ('risk', 'concern', 'problem', 'issue', 'danger', 'penalty')),  # Risk/concern questions
+    ("procedural", ('how to', 'process', 'steps', 'procedure')),                    # Procedural questions
+    ("advisory", ('should', 'recommend', 'advice', 'suggest', 'opinion')),          # Opinion/advice questions
+)
+_QUESTION_TYPE_RE = re.compile("(?=" + "|".join(
+    f"(?P<{question_type}>{'|'.join(map(re.escape, keywords))})"
+    for question_type, keywords in _QUESTION_TYPE_KEYWORDS
+) + ")")
+_QUESTION_TYPE_PRIORITY = {question_type: rank for rank, (question_type, _) in enumerate(_QUESTION_TYPE_KEYWORDS)}
+_TOP_QUESTION_TYPE = _QUESTION_TYPE_KEYWORDS[0][0]
+_YES_NO_PREFIXES = ('is ', 'are ', 'does ', 'do ', 'can ', 'will ')
+
+_LEGAL_TERM_RE = re.compile(r'\b(?:termination|liability|indemnification|compensation|'
+                            r'confidentiality|penalty|obligation|breach|clause|'
+                            r'agreement|contract|rights|duties)\b')
+
+# Pure conversational turns (thanks, greetings, "rephrase that") need no document retrieval;
+# the whole message must be such phrases, so "hi, what's the notice period?" still retrieves
+_CONVERSATIONAL_PHRASE = (
+    r'(?:thanks|thank you|thx|hi|hello|hey|there|ok|okay|great|cool|got it|please|can you|'
+    r'so much|very much|again|clarify(?: that| it)?|rephrase(?: that| it)?|'
+    r'what did you say|continue|go on)'
+)
+_CONVERSATIONAL_RE = re.compile(
+    rf'{_CONVERSATIONAL_PHRASE}(?:[\s,.!]+{_CONVERSATIONAL_PHRASE})*[\s.!?]*'
+)
+_CONVERSATIONAL_MAX_WORDS = 8
+
+
+def _skip_rag_reason(message_lower: str) -> Optional[str]:
+    """
+    🆕 Why retrieval can be skipped for this message (None = retrieve)
+    Only messages made up entirely of conversational phrases qualify; any other
+    word left over (a question, "section 4", "the lease") means retrieve
+    """
+    message_lower = message_lower.strip()
+    if len(message_lower.split()) > _CONVERSATIONAL_MAX_WORDS:
+        return None
+    return f"conversational turn ('{message_lower}')" if _CONVERSATIONAL_RE.fullmatch(message_lower) else None
+
+
+@functools.lru_cache(maxsize=1024)
 def _detect_question_type(question: str) -> str:
     """
     🆕 Detect the type of question to optimize retrieval strategy
+    Memoized per message text, so repeated phrasings skip the scan
     """
     question_lower = question.lower()
     
-    # Factual/specific questions
-    if any(word in question_lower for word in ['what is', 'define', 'explain', 'who', 'when', 'where']):
-        return "factual"
-    
-    # Comparative questions
-    if any(word in question_lower for word in ['compare', 'difference', 'better', 'versus', 'vs']):
-        return "comparative"
-    
-    # Risk/concern questions
-    if any(word in question_lower for word in ['risk', 'concern', 'problem', 'issue', 'danger', 'penalty']):
-        return "risk_analysis"
-    
-    # Procedural questions
-    if any(word in question_lower for word in ['how to', 'process', 'steps', 'procedure']):
-        return "procedural"
-    
-    # Opinion/advice questions
-    if any(word in question_lower for word in ['should', 'recommend', 'advice', 'suggest', 'opinion']):
-        return "advisory"
+    # One scan; keep the highest-priority category seen, stopping early on the top one
+    best = None
+    for match in _QUESTION_TYPE_RE.finditer(question_lower):
+        question_type = match.lastgroup
+        if question_type == _TOP_QUESTION_TYPE:
+            return question_type
+        if best is None or _QUESTION_TYPE_PRIORITY[question_type] < _QUESTION_TYPE_PRIORITY[best]:
+            best = question_type
+    if best is not None:
+        return best
     
     # Yes/No questions
-    if any(question_lower.startswith(word) for word in ['is ', 'are ', 'does ', 'do ', 'can ', 'will ']):
+    if question_lower.startswith(_YES_NO_PREFIXES):
         return "yes_no"
     
     return "general"
@@ -152,9 +344,7 @@ def _expand_query_for_retrieval(user_message: str, question_type: str) -> List[s
     queries = [user_message]  # Always include original
     
     # Extract key legal terms
-    legal_terms = re.findall(r'\b(?:termination|liability|indemnification|compensation|'
-                             r'confidentiality|penalty|obligation|breach|clause|'
-                             r'agreement|contract|rights|duties)\b', user_message.lower())
+    legal_terms = _LEGAL_TERM_RE.findall(user_message.lower())
     
     if question_type == "risk_analysis":
         queries.append(f"risks penalties consequences {' '.join(legal_terms)}")
@@ -171,7 +361,44 @@ def _expand_query_for_retrieval(user_message: str, question_type: str) -> List[s
         # Extract the main subject
         queries.append(" ".join(legal_terms) if legal_terms else user_message)
     
-    return queries[:3]  # Limit to 3 queries max
+    # Drop repeats (e.g. yes/no questions with no legal terms) so each query is embedded and searched once
+    return list(dict.fromkeys(queries))[:3]  # Limit to 3 queries max
+
+
+# Prompt token budget for retrieved sections. Tokens are estimated from characters
+# (~4 per token for English contract text on Llama-family tokenizers), which is close
+# enough for a budget and needs no tokenizer download or extra dependency. History
+# is already capped by _format_conversation_history (6 messages x 300 chars).
+_CHARS_PER_TOKEN = 4
+_DOCUMENT_CONTEXT_TOKEN_BUDGET = 4500
+_DOCUMENT_CONTEXT_CHAR_BUDGET = _DOCUMENT_CONTEXT_TOKEN_BUDGET * _CHARS_PER_TOKEN
+_BUDGET_TRUNCATION_MARK = "…[truncated]"
+
+
+def _estimate_tokens(text: str) -> int:
+    """🆕 Approximate prompt token count (see _CHARS_PER_TOKEN)"""
+    return -(-len(text) // _CHARS_PER_TOKEN)
+
+
+def _fit_chunks_to_budget(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    🆕 Keep the best-ranked chunks whose text fits _DOCUMENT_CONTEXT_CHAR_BUDGET
+    The chunk that crosses the budget is truncated (as a copy) and ends the list,
+    so the returned chunks are exactly what the prompt contains
+    """
+    remaining = _DOCUMENT_CONTEXT_CHAR_BUDGET
+    fitted = []
+    for chunk in chunks:
+        text = chunk.get('text', '')
+        if len(text) <= remaining:
+            fitted.append(chunk)
+            remaining -= len(text)
+            continue
+        if remaining > 0:
+            fitted.append({**chunk, 'text': text[:remaining] + _BUDGET_TRUNCATION_MARK})
+        logger.info(f"✂️ Document context trimmed to {len(fitted)}/{len(chunks)} chunks (~{_DOCUMENT_CONTEXT_TOKEN_BUDGET} token budget)")
+        break
+    return fitted
 
 
 async def _retrieve_contextual_chunks(
@@ -187,36 +414,31 @@ async def _retrieve_contextual_chunks(
         # Generate multiple search queries
         search_queries = _expand_query_for_retrieval(user_message, question_type)
         
-        all_chunks = []
-        seen_chunk_ids = set()
-        
-        # Retrieve using multiple queries
-        for i, query in enumerate(search_queries):
-            try:
-                chunks = await vector_service.retrieve_relevant_chunks(
-                    query=query,
-                    document_id=document_id,
-                    top_k=top_k if i == 0 else max(5, top_k // 2)  # Fewer for secondary queries
-                )
-                
-                for chunk in chunks:
-                    chunk_id = chunk.get('id')
-                    if chunk_id not in seen_chunk_ids:
-                        chunk['query_source'] = 'primary' if i == 0 else f'expanded_{i}'
-                        all_chunks.append(chunk)
-                        seen_chunk_ids.add(chunk_id)
-                
-                logger.info(f"🔍 Query {i+1} '{query[:40]}...' retrieved {len(chunks)} chunks")
-                
-            except Exception as e:
-                logger.warning(f"⚠️ Query {i+1} failed: {str(e)}")
-                continue
+        # 🆕 One batched retrieval: all queries embedded in one model pass, searches run
+        # concurrently; a failed query comes back as an empty list
+        results = await vector_service.retrieve_relevant_chunks_batch(
+            queries=search_queries,
+            document_id=document_id,
+            top_ks=[top_k] + [max(5, top_k // 2)] * (len(search_queries) - 1)  # Fewer for secondary queries
+        )
+        
+        # Merge by chunk id, keeping the best-scoring hit for chunks several queries found
+        chunks_by_id: Dict[Any, Dict[str, Any]] = {}
+        for i, (query, chunks) in enumerate(zip(search_queries, results)):
+            for chunk in chunks:
+                chunk_id = chunk.get('id')
+                existing = chunks_by_id.get(chunk_id)
+                if existing is None or chunk.get('score', 0.0) > existing.get('score', 0.0):
+                    chunk['query_source'] = 'primary' if i == 0 else f'expanded_{i}'
+                    chunks_by_id[chunk_id] = chunk
+            
+            logger.info(f"🔍 Query {i+1} '{query[:40]}...' retrieved {len(chunks)} chunks")
         
         # Sort by relevance score
-        all_chunks.sort(key=lambda x: x.get('score', 0.0), reverse=True)
+        all_chunks = sorted(chunks_by_id.values(), key=lambda x: x.get('score', 0.0), reverse=True)
         
-        # Take top-k most relevant
-        final_chunks = all_chunks[:top_k]
+        # Take top-k most relevant, then trim to the prompt's document-context budget
+        final_chunks = _fit_chunks_to_budget(all_chunks[:top_k])
         
         # Format chunks with enhanced metadata
         formatted_context = _format_chunks_for_chatbot(final_chunks, question_type)
@@ -230,14 +452,50 @@ async def _retrieve_contextual_chunks(
         return [], ""
 
 
+# Decorative prompt separators, built once (each is a multi-byte 66-char rule)
+_CHAT_RULE = "━" * 66
+_CHAT_SECTION_HEAD = "\n" + _CHAT_RULE + "\n"
+_CHAT_SECTION_SEPARATED_HEAD = "\n" + _CHAT_SECTION_HEAD
+_CHAT_SECTION_BODY_OPEN = "\n" + _CHAT_RULE + "\n\n"
+_HISTORY_HEAD = _CHAT_RULE + "\n📜 PREVIOUS CONVERSATION CONTEXT:\n" + _CHAT_RULE + "\n\n"
+_HISTORY_FOOT = _CHAT_RULE
+_HISTORY_ROLE_OPEN = {"user": "[USER]: "}
+_HISTORY_PREVIEW_CHARS = 300
+
+# Chat prompt section headers and closing instructions (static per request shape)
+_DOCUMENT_SECTIONS_HEAD = _CHAT_RULE + "\n📄 RELEVANT DOCUMENT SECTIONS:\n" + _CHAT_RULE + "\n\n"
+_CURRENT_QUESTION_HEAD = _CHAT_RULE + "\n🎯 CURRENT USER QUESTION:\n" + _CHAT_RULE + "\n\n"
+_ANSWER_INSTRUCTIONS_RAG = """
+📋 ANSWERING INSTRUCTIONS:
+1. Base your answer STRICTLY on the document sections provided above
+2. Cite specific section numbers when referencing contract content
+3. Quote relevant contract language when appropriate
+4. If the answer is not in the provided sections, clearly state that
+5. Do not make assumptions or add information not present in the document
+
+Now, provide your answer:"""
+_ANSWER_INSTRUCTIONS_GENERAL = """
+💡 ANSWERING INSTRUCTIONS:
+1. Provide a helpful answer based on general legal knowledge
+2. Clarify that you're not referencing a specific uploaded document
+3. Suggest uploading a document for specific contract analysis if relevant
+
+Now, provide your answer:"""
+
+# Relevance tags: a score strictly above a threshold moves up one tag
+_RELEVANCE_THRESHOLDS = (0.5, 0.7)
+_RELEVANCE_TAGS = ("📄 CONTEXT", "📌 RELEVANT", "🔥 HIGH RELEVANCE")
+
+
 def _format_chunks_for_chatbot(chunks: List[Dict[str, Any]], question_type: str) -> str:
     """
     🆕 Format retrieved chunks with metadata for optimal chatbot understanding
+    Every section's pieces go into one parts list that is joined once.
     """
     if not chunks:
         return ""
     
-    formatted_sections = []
+    parts: List[str] = []
     
     for i, chunk in enumerate(chunks):
         chunk_text = chunk.get('text', '')
@@ -245,23 +503,21 @@ def _format_chunks_for_chatbot(chunks: List[Dict[str, Any]], question_type: str)
         relevance_score = chunk.get('score', 0.0)
         
         # Add relevance indicator
-        if relevance_score > 0.7:
-            relevance_tag = "🔥 HIGH RELEVANCE"
-        elif relevance_score > 0.5:
-            relevance_tag = "📌 RELEVANT"
-        else:
-            relevance_tag = "📄 CONTEXT"
+        relevance_tag = _RELEVANCE_TAGS[bisect.bisect_left(_RELEVANCE_THRESHOLDS, relevance_score)]
         
-        section = f"""
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-{relevance_tag} | Section {chunk_index + 1} | Relevance: {relevance_score:.2f}
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-{chunk_text}
-"""
-        formatted_sections.append(section)
+        parts.extend((
+            _CHAT_SECTION_SEPARATED_HEAD if i else _CHAT_SECTION_HEAD,
+            relevance_tag,
+            " | Section ",
+            str(chunk_index + 1),
+            " | Relevance: ",
+            f"{relevance_score:.2f}",
+            _CHAT_SECTION_BODY_OPEN,
+            chunk_text,
+            "\n"
+        ))
     
-    return "\n".join(formatted_sections)
+    return "".join(parts)
 
 
 def _format_conversation_history(history: List[Dict[str, Any]]) -> str:
@@ -271,29 +527,21 @@ def _format_conversation_history(history: List[Dict[str, Any]]) -> str:
     if not history:
         return ""
     
-    formatted = ["━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"]
-    formatted.append("📜 PREVIOUS CONVERSATION CONTEXT:")
-    formatted.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
+    parts = [_HISTORY_HEAD]
     
     for msg in history[-6:]:  # Last 3 exchanges
-        role = "USER" if msg['role'] == 'user' else "ASSISTANT"
-        content = msg['content'][:300] + "..." if len(msg['content']) > 300 else msg['content']
-        formatted.append(f"[{role}]: {content}\n")
+        content = msg['content']
+        if len(content) > _HISTORY_PREVIEW_CHARS:
+            content = content[:_HISTORY_PREVIEW_CHARS] + "..."
+        parts.extend((_HISTORY_ROLE_OPEN.get(msg['role'], "[ASSISTANT]: "), content, "\n\n"))
     
-    formatted.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
+    parts.append(_HISTORY_FOOT)
     
-    return "\n".join(formatted)
+    return "".join(parts)
 
 
-def _build_enhanced_system_prompt(
-    has_document_context: bool,
-    question_type: str,
-    has_conversation_history: bool
-) -> str:
-    """
-    🆕 Build dynamic system prompt based on context availability and question type
-    """
-    base_prompt = """You are Accord AI, an expert legal assistant specializing in contract analysis and legal document review.
+# Static system prompt blocks, combined per (document context, question type, history)
+_SYSTEM_PROMPT_BASE = """You are Accord AI, an expert legal assistant specializing in contract analysis and legal document review.
 
 Your core capabilities:
 - Analyze and explain legal documents with precision
@@ -309,60 +557,130 @@ Critical guidelines:
 - Never fabricate legal information or contract terms
 - Be professional, accurate, and concise
 - Use clear language to explain complex legal concepts"""
-    
-    # Add context-specific instructions
-    if has_document_context:
-        base_prompt += """
+
+_SYSTEM_PROMPT_DOCUMENT = """
 
 📋 DOCUMENT CONTEXT IS PROVIDED:
 - You have access to relevant sections from the user's uploaded contract
 - Reference these sections EXPLICITLY when answering (e.g., "According to Section 3...")
 - Quote specific contract language when relevant
 - If the answer requires information not in the provided sections, say so clearly"""
-    
-    else:
-        base_prompt += """
+
+_SYSTEM_PROMPT_NO_DOCUMENT = """
 
 ⚠️ NO DOCUMENT CONTEXT AVAILABLE:
 - No specific document has been uploaded or the question is general
 - Provide general legal knowledge and explanations
 - Clarify that you're not referencing a specific contract
 - Suggest uploading a document for specific analysis"""
-    
-    # Add conversation context note
-    if has_conversation_history:
-        base_prompt += """
+
+_SYSTEM_PROMPT_HISTORY = """
 
 💬 CONVERSATION HISTORY IS PROVIDED:
 - Review the previous conversation to maintain context
 - Reference earlier questions/answers when relevant
 - Provide coherent responses that build on prior discussion"""
-    
-    # Add question-type specific guidance
-    if question_type == "yes_no":
-        base_prompt += """
+
+# Question-type specific guidance (other types add nothing)
+_SYSTEM_PROMPT_QUESTION_GUIDANCE = {
+    "yes_no": """
 
 ❓ ANSWERING YES/NO QUESTION:
 - Start with a clear YES or NO answer
-- Then provide brief explanation with supporting details from the document"""
-    
-    elif question_type == "risk_analysis":
-        base_prompt += """
+- Then provide brief explanation with supporting details from the document""",
+    "risk_analysis": """
 
 ⚠️ RISK ANALYSIS QUESTION:
 - Identify specific risks mentioned in the contract sections
 - Explain potential consequences
-- Quote relevant clauses that create the risk"""
-    
-    elif question_type == "comparative":
-        base_prompt += """
+- Quote relevant clauses that create the risk""",
+    "comparative": """
 
 🔄 COMPARATIVE QUESTION:
 - Compare the relevant aspects clearly
 - Use specific examples from the document
 - Present information in an organized manner"""
-    
-    return base_prompt
+}
+
+
+def _compose_system_prompt(
+    has_document_context: bool,
+    question_type: str,
+    has_conversation_history: bool
+) -> str:
+    """🆕 Join the system prompt blocks for one (context, question type, history) combination"""
+    return "".join((
+        _SYSTEM_PROMPT_BASE,
+        # Add context-specific instructions
+        _SYSTEM_PROMPT_DOCUMENT if has_document_context else _SYSTEM_PROMPT_NO_DOCUMENT,
+        # Add conversation context note
+        _SYSTEM_PROMPT_HISTORY if has_conversation_history else "",
+        # Add question-type specific guidance
+        _SYSTEM_PROMPT_QUESTION_GUIDANCE.get(question_type, "")
+    ))
+
+
+# Every prompt _detect_question_type can lead to, composed once at import
+_SYSTEM_PROMPT_TABLE: Dict[Tuple[bool, str, bool], str] = {
+    (has_document_context, question_type, has_conversation_history):
+        _compose_system_prompt(has_document_context, question_type, has_conversation_history)
+    for has_document_context in (False, True)
+    for question_type in (*_QUESTION_TYPE_PRIORITY, "yes_no", "general")
+    for has_conversation_history in (False, True)
+}
+
+
+# 🆕 Turns with no document context and no history: the whole prompt around the
+# question is fixed per question type, so it is precomposed (same text as Step 5)
+_GENERAL_TURN_PREFIXES = {
+    question_type: prompt + "\n\n" + _CURRENT_QUESTION_HEAD
+    for (has_document_context, question_type, has_conversation_history), prompt in _SYSTEM_PROMPT_TABLE.items()
+    if not has_document_context and not has_conversation_history
+}
+_GENERAL_TURN_SUFFIX = "\n\n" + _ANSWER_INSTRUCTIONS_GENERAL
+
+
+def _build_enhanced_system_prompt(
+    has_document_context: bool,
+    question_type: str,
+    has_conversation_history: bool
+) -> str:
+    """
+    🆕 Build dynamic system prompt based on context availability and question type
+    A lookup in the precomposed _SYSTEM_PROMPT_TABLE
+    """
+    key = (has_document_context, question_type, has_conversation_history)
+    prompt = _SYSTEM_PROMPT_TABLE.get(key)
+    if prompt is None:  # Not a _detect_question_type category
+        prompt = _compose_system_prompt(*key)
+    return prompt
+
+
+# Dollar amounts and durations that a grounded answer should find in the chunks
+_RESPONSE_NUMBER_RE = re.compile(r'\$[\d,]+|\d+\s*(?:days|months|years)')
+
+
+_WORD_RE = re.compile(r'\S+')
+
+
+def _count_words(text: str, limit: int) -> int:
+    """Whitespace-separated word count of text, capped at limit"""
+    return sum(1 for _ in islice(_WORD_RE.finditer(text), limit))
+
+
+def _chunks_contain(needle: str, chunks: List[Dict[str, Any]], lowered: Dict[int, str]) -> bool:
+    """
+    🆕 Whether any chunk's text contains needle (already lowercased)
+    lowered memoizes each chunk's lowercased text for the current check; the chunk
+    dicts themselves are shared cache entries, so nothing is stored on them
+    """
+    for i, chunk in enumerate(chunks):
+        text_lower = lowered.get(i)
+        if text_lower is None:
+            text_lower = lowered[i] = chunk.get('text', '').lower()
+        if needle in text_lower:
+            return True
+    return False
 
 
 def _verify_response_quality(
@@ -376,22 +694,21 @@ def _verify_response_quality(
     """
     warnings = []
     
-    # Check if response is too short for substantial questions
-    if len(question.split()) > 5 and len(response.split()) < 20:
+    # Check if response is too short for substantial questions (counting stops at 20 words,
+    # so a long answer is never split into a full word list)
+    if len(question.split()) > 5 and _count_words(response, limit=20) < 20:
         warnings.append("Response may be incomplete - consider asking for more detail")
     
     # Check if response claims information not in chunks (basic hallucination detection)
     if chunks and len(response) > 100:
-        # Extract chunk text for comparison
-        chunk_text_combined = " ".join([c.get('text', '') for c in chunks]).lower()
-        
         # Check for suspicious specific numbers/dates in response that aren't in chunks
-        response_numbers = re.findall(r'\$[\d,]+|\d+\s*(?:days|months|years)', response)
+        response_numbers = [m.group(0) for m in islice(_RESPONSE_NUMBER_RE.finditer(response), 3)]  # Check first 3 numbers
         if response_numbers:
-            for num in response_numbers[:3]:  # Check first 3 numbers
-                if num.lower() not in chunk_text_combined:
-                    warnings.append("Response may contain details not present in the document - verify carefully")
-                    break
+            # No combined copy of the chunk text: each number is looked up chunk by chunk,
+            # stopping at the first chunk that contains it (and at the first missing number)
+            lowered: Dict[int, str] = {}
+            if any(not _chunks_contain(num.lower(), chunks, lowered) for num in response_numbers):
+                warnings.append("Response may contain details not present in the document - verify carefully")
     
     # Add warning footer if issues detected
     if warnings:
@@ -404,179 +721,294 @@ def _verify_response_quality(
 # MAIN CHAT ENDPOINT (Name Preserved, Logic Enhanced)
 # ============================================================================
 
+_CHAT_HISTORY_TURNS = 10  # Messages of history read per chat turn
+
+
+async def _completed(value):
+    """Awaitable that returns value (stands in for a lookup that is already done)"""
+    return value
+
+
+def _chat_retrieval_key(session_document_id: str, question_type: str, user_message: str) -> Tuple[str, str]:
+    """🆕 chat_retrieval_cache key: case and whitespace differences map to the same entry"""
+    normalized = " ".join(user_message.lower().split())
+    digest = hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+    return session_document_id, f"chat:{question_type}:{digest}"
+
+
+# 🆕 In-flight chat retrievals, keyed like chat_retrieval_cache
+_chat_retrieval_flights = SingleFlight()
+
+
+async def _retrieve_chat_context(
+    session_document_id: str,
+    user_message: str,
+    question_type: str
+) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    🆕 Step 3 of a chat turn: (relevant_chunks, document_context) for the message
+    Failures and empty results come back as a notice in document_context
+    """
+    # 🆕 Repeated (or re-cased / re-spaced) questions on a document reuse its retrieval
+    cache_key = _chat_retrieval_key(session_document_id, question_type, user_message)
+    cached = await chat_retrieval_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"⚡ Chat retrieval cache hit for doc: {session_document_id}")
+        document_context, relevant_chunks = cached
+        return relevant_chunks, document_context
+    
+    async def retrieve_and_cache() -> Tuple[List[Dict[str, Any]], str]:
+        logger.info(f"🔍 Retrieving context for doc: {session_document_id}")
+        
+        # Use enhanced contextual retrieval
+        relevant_chunks, document_context = await _retrieve_contextual_chunks(
+            document_id=session_document_id,
+            user_message=user_message,
+            question_type=question_type,
+            top_k=10  # Increased from 5 for better coverage
+        )
+        if relevant_chunks:
+            await chat_retrieval_cache.put(cache_key, (document_context, relevant_chunks))
+        return relevant_chunks, document_context
+    
+    try:
+        # 🆕 Concurrent identical questions (multi-tab, double submit) share one retrieval
+        (relevant_chunks, document_context), joined = await _chat_retrieval_flights.run(cache_key, retrieve_and_cache)
+        if joined:
+            logger.info(f"🔗 Joined in-flight retrieval for doc: {session_document_id}")
+        
+        if relevant_chunks:
+            logger.info(f"✅ Retrieved {len(relevant_chunks)} relevant chunks")
+        else:
+            logger.warning(f"⚠️ No relevant chunks found for {session_document_id}")
+            document_context = "⚠️ No relevant content found in the document for this question. The document may not contain information about this topic."
+        return relevant_chunks, document_context
+        
+    except Exception as e:
+        logger.error(f"❌ Document retrieval failed: {str(e)}")
+        return [], "❌ Error retrieving document content. Please try again."
+
+
+async def _prepare_chat_turn(
+    request: ChatRequest,
+    session_id: str,
+    conversation_history: Optional[List[Dict[str, Any]]] = None
+) -> Tuple[str, List[Dict[str, Any]], str]:
+    """
+    🆕 Steps 1-5 of a chat turn, shared by /chat and /chat/stream
+    conversation_history skips the history lookup when the caller already has it
+    Returns (full_prompt, relevant_chunks, document_context)
+    """
+    # 🆕 Step 1: Detect question type for optimized retrieval
+    question_type = _detect_question_type(request.message)
+    logger.info(f"🔍 Question type detected: {question_type}")
+    
+    skip_rag_reason = _skip_rag_reason(request.message.lower()) if request.use_rag and request.document_id else None
+    if skip_rag_reason:
+        logger.info(f"⏭️ Skipping retrieval: {skip_rag_reason}")
+    
+    # 🆕 Step 2: Retrieve conversation history for context
+    history_lookup = (
+        conversation_store.get_history(session_id, last_n=_CHAT_HISTORY_TURNS)
+        if conversation_history is None else _completed(conversation_history)
+    )
+    
+    # 🆕 Step 3: Enhanced RAG retrieval (if document provided), overlapped with the history lookup
+    if request.use_rag and request.document_id and not skip_rag_reason:
+        conversation_history, (relevant_chunks, document_context) = await asyncio.gather(
+            history_lookup,
+            _retrieve_chat_context(f"{session_id}_{request.document_id}", request.message, question_type)
+        )
+    else:
+        conversation_history = await history_lookup
+        relevant_chunks, document_context = [], ""
+    has_history = len(conversation_history) > 0
+    
+    # 🆕 Short-circuit: a plain general question needs no prompt assembly
+    if not has_history and not document_context:
+        prompt_prefix = _GENERAL_TURN_PREFIXES.get(question_type)
+        if prompt_prefix is not None:
+            return prompt_prefix + request.message + _GENERAL_TURN_SUFFIX, relevant_chunks, document_context
+    
+    # 🆕 Step 4: Build enhanced system prompt
+    system_prompt = _build_enhanced_system_prompt(
+        has_document_context=bool(document_context and relevant_chunks),
+        question_type=question_type,
+        has_conversation_history=has_history
+    )
+    
+    # 🆕 Step 5: Construct comprehensive prompt with all context: static banners and
+    # instructions are module constants, so the prompt is one join of a few pieces
+    prompt_parts = [system_prompt, "\n\n"]
+    
+    # Add conversation history if available
+    if has_history:
+        prompt_parts += (_format_conversation_history(conversation_history), "\n\n")
+    
+    # Add document context if available
+    if document_context:
+        prompt_parts += (_DOCUMENT_SECTIONS_HEAD, document_context, "\n\n")
+    
+    # Add current question with specific answering instructions based on context
+    prompt_parts += (
+        _CURRENT_QUESTION_HEAD,
+        request.message,
+        "\n\n",
+        _ANSWER_INSTRUCTIONS_RAG if document_context and relevant_chunks else _ANSWER_INSTRUCTIONS_GENERAL,
+    )
+    
+    full_prompt = "".join(prompt_parts)
+    
+    return full_prompt, relevant_chunks, document_context
+
+
+_SECTION_PREVIEW_CHARS = 200
+
+
+def _section(i: int, chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    🆕 Preview of one retrieved chunk
+    Text and index are read once; short texts are passed through unsliced
+    """
+    text = chunk.get("text", "")
+    if len(text) > _SECTION_PREVIEW_CHARS:
+        text = text[:_SECTION_PREVIEW_CHARS] + "..."
+    chunk_index = chunk.get("chunk_index", i)
+    return {
+        "chunk_index": chunk_index,
+        "text_preview": text,
+        "relevance_score": chunk.get("score", 0.0),
+        "section_reference": f"Section {chunk_index + 1}"
+    }
+
+
+def _relevant_sections(relevant_chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """🆕 Section previews returned alongside a chat answer"""
+    return [_section(i, chunk) for i, chunk in enumerate(relevant_chunks)]
+
+
+# ============================================================================
+# IN-FLIGHT CHAT TURNS (Double Submits)
+# ============================================================================
+
+# Identical turns (same session, document, message and history) arriving while one
+# is being answered share its LLM call instead of starting their own
+_chat_turn_flights = SingleFlight()
+
+
+def _chat_turn_key(session_id: str, request: ChatRequest, history: List[Dict[str, Any]]) -> str:
+    """🆕 Key for one question on one document in one session, at one point in its history"""
+    hasher = hashlib.blake2b(
+        f"{session_id}|{request.document_id}|{request.use_rag}|{request.message}".encode(),
+        digest_size=16
+    )
+    hasher.update(orjson.dumps([(message.get("role"), message.get("content")) for message in history]))
+    return hasher.hexdigest()
+
+
+async def _answer_chat_turn(
+    request: ChatRequest,
+    session_id: str,
+    conversation_history: List[Dict[str, Any]]
+) -> Tuple[str, List[Dict[str, Any]], str]:
+    """
+    🆕 Steps 1-7 of a /chat turn
+    Returns (final_answer, relevant_chunks, document_context)
+    """
+    # 🆕 Steps 1-5: question type, history, retrieval, prompt assembly
+    full_prompt, relevant_chunks, document_context = await _prepare_chat_turn(
+        request, session_id, conversation_history=conversation_history
+    )
+    
+    # 🆕 Step 6: Call LLM with enhanced prompt
+    try:
+        logger.info(f"🤖 Calling LLM with enhanced prompt (~{_estimate_tokens(full_prompt)} tokens)")
+        
+        # Use system message for better instruction following
+        llm_response = await llm_service.call_groq_queued(full_prompt, CHAT_SYSTEM_MESSAGE)
+        
+        # 🆕 Handle response format (dict or string)
+        if isinstance(llm_response, dict):
+            # Try multiple keys where content might be
+            final_answer = (
+                llm_response.get("content") or 
+                llm_response.get("response") or
+                llm_response.get("result") or
+                llm_response.get("text") or
+                str(llm_response)
+            )
+        else:
+            final_answer = str(llm_response)
+        
+        # 🆕 Step 7: Verify response quality and add warnings if needed
+        final_answer, quality_warnings = _verify_response_quality(
+            response=final_answer,
+            chunks=relevant_chunks,
+            question=request.message
+        )
+        
+        if quality_warnings:
+            logger.warning(f"⚠️ Response quality warnings: {', '.join(quality_warnings)}")
+        
+    except Exception as e:
+        logger.error(f"❌ LLM generation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
+    
+    return final_answer, relevant_chunks, document_context
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(
     request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    http_request: Request,
     current_session: dict = Depends(get_current_session)
 ):
     """
     ✅ ENDPOINT NAME PRESERVED: /chat
     ✅ FUNCTION NAME PRESERVED: chat_endpoint
     🔧 LOGIC COMPLETELY REWRITTEN for enhanced conversational RAG
+    🆕 Clients sending "Accept: text/event-stream" get the /chat/stream SSE response
     """
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        return await chat_stream_endpoint(request, background_tasks, current_session)
+    
     try:
         session_id = current_session["session_id"]
         logger.info(f"💬 Enhanced chat request from session {session_id[:8]}...")
         
-        # 🆕 Step 1: Detect question type for optimized retrieval
-        question_type = _detect_question_type(request.message)
-        logger.info(f"🔍 Question type detected: {question_type}")
-        
-        # 🆕 Step 2: Retrieve conversation history for context
-        conversation_history = conversation_store.get_history(session_id, last_n=10)
-        has_history = len(conversation_history) > 0
+        conversation_history = await conversation_store.get_history(session_id, last_n=_CHAT_HISTORY_TURNS)
         
-        # 🆕 Step 3: Enhanced RAG retrieval (if document provided)
-        relevant_chunks = []
-        document_context = ""
-        
-        if request.use_rag and request.document_id:
-            session_document_id = f"{session_id}_{request.document_id}"
-            logger.info(f"🔍 Retrieving context for doc: {session_document_id}")
-            
-            try:
-                # Use enhanced contextual retrieval
-                relevant_chunks, document_context = await _retrieve_contextual_chunks(
-                    document_id=session_document_id,
-                    user_message=request.message,
-                    question_type=question_type,
-                    top_k=10  # Increased from 5 for better coverage
-                )
-                
-                if relevant_chunks:
-                    logger.info(f"✅ Retrieved {len(relevant_chunks)} relevant chunks")
-                else:
-                    logger.warning(f"⚠️ No relevant chunks found for {session_document_id}")
-                    document_context = "⚠️ No relevant content found in the document for this question. The document may not contain information about this topic."
-                    
-            except Exception as e:
-                logger.error(f"❌ Document retrieval failed: {str(e)}")
-                document_context = "❌ Error retrieving document content. Please try again."
-        
-        # 🆕 Step 4: Build enhanced system prompt
-        system_prompt = _build_enhanced_system_prompt(
-            has_document_context=bool(document_context and relevant_chunks),
-            question_type=question_type,
-            has_conversation_history=has_history
+        # 🆕 A double submit of a turn still being answered joins that call
+        (final_answer, relevant_chunks, document_context), joined = await _chat_turn_flights.run(
+            _chat_turn_key(session_id, request, conversation_history),
+            lambda: _answer_chat_turn(request, session_id, conversation_history)
         )
         
-        # 🆕 Step 5: Construct comprehensive prompt with all context
-        prompt_parts = []
-        
-        # Add system instructions
-        prompt_parts.append(system_prompt)
-        prompt_parts.append("\n\n")
-        
-        # Add conversation history if available
-        if has_history:
-            formatted_history = _format_conversation_history(conversation_history)
-            prompt_parts.append(formatted_history)
-            prompt_parts.append("\n\n")
-        
-        # Add document context if available
-        if document_context:
-            prompt_parts.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-            prompt_parts.append("\n📄 RELEVANT DOCUMENT SECTIONS:\n")
-            prompt_parts.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n")
-            prompt_parts.append(document_context)
-            prompt_parts.append("\n\n")
-        
-        # Add current question with clear instructions
-        prompt_parts.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━")
-        prompt_parts.append("\n🎯 CURRENT USER QUESTION:\n")
-        prompt_parts.append("━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n\n")
-        prompt_parts.append(f"{request.message}\n\n")
-        
-        # Add specific answering instructions based on context
-        if document_context and relevant_chunks:
-            prompt_parts.append("""
-📋 ANSWERING INSTRUCTIONS:
-1. Base your answer STRICTLY on the document sections provided above
-2. Cite specific section numbers when referencing contract content
-3. Quote relevant contract language when appropriate
-4. If the answer is not in the provided sections, clearly state that
-5. Do not make assumptions or add information not present in the document
-
-Now, provide your answer:""")
+        if joined:
+            logger.info(f"⚡ Joined in-flight chat turn for session {session_id[:8]}...")
         else:
-            prompt_parts.append("""
-💡 ANSWERING INSTRUCTIONS:
-1. Provide a helpful answer based on general legal knowledge
-2. Clarify that you're not referencing a specific uploaded document
-3. Suggest uploading a document for specific contract analysis if relevant
-
-Now, provide your answer:""")
-        
-        full_prompt = "".join(prompt_parts)
-        
-        # 🆕 Step 6: Call LLM with enhanced prompt
-        try:
-            logger.info(f"🤖 Calling LLM with enhanced prompt ({len(full_prompt)} chars)")
-            
-            # Use system message for better instruction following
-            system_message = "You are Accord AI, a legal document analysis expert. Follow all instructions precisely."
-            
-            llm_response = await llm_service.call_groq(full_prompt, system_message)
-            
-            # 🆕 Handle response format (dict or string)
-            if isinstance(llm_response, dict):
-                # Try multiple keys where content might be
-                final_answer = (
-                    llm_response.get("content") or 
-                    llm_response.get("response") or
-                    llm_response.get("result") or
-                    llm_response.get("text") or
-                    str(llm_response)
-                )
-            else:
-                final_answer = str(llm_response)
-            
-            # 🆕 Step 7: Verify response quality and add warnings if needed
-            final_answer, quality_warnings = _verify_response_quality(
-                response=final_answer,
-                chunks=relevant_chunks,
-                question=request.message
+            # 🆕 Step 8: Store conversation in history for future context, after the
+            # response has been sent so the write never delays it (once per turn)
+            background_tasks.add_task(
+                conversation_store.add_messages,
+                session_id=session_id,
+                messages=[
+                    {"role": "user", "content": request.message},
+                    {"role": "assistant", "content": final_answer},
+                ],
+                document_id=request.document_id
             )
-            
-            if quality_warnings:
-                logger.warning(f"⚠️ Response quality warnings: {', '.join(quality_warnings)}")
-            
-        except Exception as e:
-            logger.error(f"❌ LLM generation failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"AI generation failed: {str(e)}")
+            logger.info(f"✅ Chat response generated: {len(final_answer)} characters")
         
-        # 🆕 Step 8: Store conversation in history for future context
-        conversation_store.add_message(
-            session_id=session_id,
-            role="user",
-            content=request.message,
-            document_id=request.document_id
-        )
-        
-        conversation_store.add_message(
-            session_id=session_id,
-            role="assistant",
-            content=final_answer,
-            document_id=request.document_id
-        )
-        
-        logger.info(f"✅ Chat response generated: {len(final_answer)} characters")
-        
-        # 🆕 Step 9: Return enhanced response with metadata
-        return ChatResponse(
+        # 🆕 Step 9: Return enhanced response with metadata (every field is server-built
+        # and already well-typed, so construction skips validation)
+        return ChatResponse.model_construct(
             response=final_answer,
             chunks_retrieved=len(relevant_chunks),
-            relevant_sections=[
-                {
-                    "chunk_index": chunk.get("chunk_index", i),
-                    "text_preview": chunk.get("text", "")[:200] + "..." if len(chunk.get("text", "")) > 200 else chunk.get("text", ""),
-                    "relevance_score": chunk.get("score", 0.0),
-                    "section_reference": f"Section {chunk.get('chunk_index', i) + 1}"
-                }
-                for i, chunk in enumerate(relevant_chunks)
-            ],
+            relevant_sections=_relevant_sections(relevant_chunks),
             used_rag=bool(document_context and relevant_chunks),
-            timestamp=datetime.now().isoformat(),
+            timestamp=now_iso(),
             session_id=session_id
         )
         
@@ -587,6 +1019,82 @@ Now, provide your answer:""")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> bytes:
+    """🆕 One Server-Sent Events frame with an orjson-encoded payload"""
+    frame = b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"event: " + event.encode() + b"\n" + frame if event else frame
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_session: dict = Depends(get_current_session)
+):
+    """
+    🆕 /chat as Server-Sent Events: the answer is sent token by token as Groq
+    generates it, so the client renders the first words after ~one token of
+    latency instead of the whole completion.
+    Frames: data {"delta"} per token, then event "done" with the ChatResponse
+    metadata (and any quality note), or event "error".
+    """
+    session_id = current_session["session_id"]
+    logger.info(f"💬 Streaming chat request from session {session_id[:8]}...")
+    
+    try:
+        full_prompt, relevant_chunks, document_context = await _prepare_chat_turn(request, session_id)
+    except Exception as e:
+        logger.error(f"❌ Chat stream preparation error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    async def event_stream():
+        answer_parts: List[str] = []
+        try:
+            async for delta in llm_service.call_groq_stream_queued(full_prompt, CHAT_SYSTEM_MESSAGE):
+                answer_parts.append(delta)
+                yield _sse_event({"delta": delta})
+        except Exception as e:
+            logger.error(f"❌ LLM streaming failed: {str(e)}")
+            yield _sse_event({"detail": f"AI generation failed: {str(e)}"}, event="error")
+            return
+        
+        # Quality check runs on the finished answer; any note is sent with the final frame
+        streamed_answer = "".join(answer_parts)
+        final_answer, quality_warnings = _verify_response_quality(
+            response=streamed_answer,
+            chunks=relevant_chunks,
+            question=request.message
+        )
+        
+        # Persisted once the stream has closed (FastAPI runs the tasks after the body)
+        background_tasks.add_task(
+            conversation_store.add_messages,
+            session_id=session_id,
+            messages=[
+                {"role": "user", "content": request.message},
+                {"role": "assistant", "content": final_answer},
+            ],
+            document_id=request.document_id
+        )
+        
+        logger.info(f"✅ Streamed chat response: {len(final_answer)} characters")
+        
+        yield _sse_event({
+            "note": final_answer[len(streamed_answer):] if quality_warnings else None,
+            "chunks_retrieved": len(relevant_chunks),
+            "relevant_sections": _relevant_sections(relevant_chunks),
+            "used_rag": bool(document_context and relevant_chunks),
+            "timestamp": now_iso(),
+            "session_id": session_id
+        }, event="done")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ============================================================================
 # CONVERSATION HISTORY ENDPOINTS (Names Preserved, Enhanced)
 # ============================================================================
@@ -599,13 +1107,13 @@ async def get_conversation_history(current_session: dict = Depends(get_current_s
     🔧 Now returns actual conversation history from store
     """
     session_id = current_session["session_id"]
-    messages = conversation_store.get_history(session_id, last_n=50)
+    messages = await conversation_store.get_history(session_id, last_n=50)
     
     return ConversationHistoryResponse(
         messages=messages,
         message_count=len(messages),
         session_id=session_id,
-        timestamp=datetime.now().isoformat()
+        timestamp=now_iso()
     )
 
 
@@ -617,14 +1125,14 @@ async def clear_conversation(current_session: dict = Depends(get_current_session
     🔧 Now actually clears conversation history
     """
     session_id = current_session["session_id"]
-    conversation_store.clear_history(session_id)
+    await conversation_store.clear_history(session_id)
     
     logger.info(f"🗑️ Cleared conversation history for session {session_id[:8]}...")
     
     return {
         "message": "Conversation history cleared successfully",
         "session_id": session_id,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso()
     }
 
 
@@ -636,7 +1144,7 @@ async def get_conversation_summary(current_session: dict = Depends(get_current_s
     🔧 Now returns actual conversation summary
     """
     session_id = current_session["session_id"]
-    summary = conversation_store.get_summary(session_id)
+    summary = await conversation_store.get_summary(session_id)
     
     return ConversationSummaryResponse(
         message_count=summary.get("message_count", 0),
@@ -667,40 +1175,48 @@ async def health_check():
     }
 
 
+# Example questions never change, so they are serialized once at import
+_EXAMPLES_BYTES = orjson.dumps({
+    "examples": {
+        "general_questions": [
+            "What is a service bond?",
+            "Explain liquidated damages in simple terms",
+            "What are common risks in employment contracts?"
+        ],
+        "document_specific": [
+            "What are the payment terms in this contract?",
+            "Is there a non-compete clause?",
+            "What are the termination conditions?",
+            "What penalties are mentioned for early termination?",
+            "Who owns the intellectual property created during employment?"
+        ],
+        "comparative": [
+            "What's the difference between termination with cause and without cause?",
+            "Compare the obligations of both parties"
+        ],
+        "risk_questions": [
+            "What are the main risks in this contract?",
+            "What penalties could I face?",
+            "Are there any concerning clauses?"
+        ]
+    },
+    "tips": [
+        "Be specific in your questions for better answers",
+        "Reference document sections if you know them",
+        "Ask follow-up questions to drill deeper into topics",
+        "Use 'explain in simple terms' for complex legal concepts"
+    ]
+})
+
+
 @router.get("/examples")
 async def get_chatbot_examples():
     """Get example questions for the chatbot"""
-    return {
-        "examples": {
-            "general_questions": [
-                "What is a service bond?",
-                "Explain liquidated damages in simple terms",
-                "What are common risks in employment contracts?"
-            ],
-            "document_specific": [
-                "What are the payment terms in this contract?",
-                "Is there a non-compete clause?",
-                "What are the termination conditions?",
-                "What penalties are mentioned for early termination?",
-                "Who owns the intellectual property created during employment?"
-            ],
-            "comparative": [
-                "What's the difference between termination with cause and without cause?",
-                "Compare the obligations of both parties"
-            ],
-            "risk_questions": [
-                "What are the main risks in this contract?",
-                "What penalties could I face?",
-                "Are there any concerning clauses?"
-            ]
-        },
-        "tips": [
-            "Be specific in your questions for better answers",
-            "Reference document sections if you know them",
-            "Ask follow-up questions to drill deeper into topics",
-            "Use 'explain in simple terms' for complex legal concepts"
-        ]
-    }
+    return Response(
+        content=_EXAMPLES_BYTES,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
 
 
 # Export the router (unchanged)
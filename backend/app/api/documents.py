@@ -1,17 +1,25 @@
 # app/api/documents.py
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Header
 from pydantic import BaseModel
+import asyncio
 import hashlib
+import os
+import re
+import tempfile
+import time
 from datetime import datetime
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 # Import services
 from app.services.vector_service import vector_service
-from app.services.pdf_service import pdf_service
+from app.services.pdf_service import extract_text_from_pdf_async
+from app.config import settings
+from app.services.retrieval_cache import retrieval_cache, chat_retrieval_cache
 
 # 🟢 RE-IMPORTED: The real auth dependency
 from app.api.auth import get_current_session 
+from app.utils.time_utils import now_iso
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -33,6 +41,37 @@ class StoreChunkResponse(BaseModel):
     extraction_info: dict
     backend_type: str = "Pinecone Enhanced Legal"
 
+_UPLOAD_CHUNK_BYTES = 1 << 20
+# Filename characters replaced with "_" in generated document IDs
+_FILENAME_SEPARATORS_RE = re.compile(r'[ -]')
+
+
+async def _spool_upload(file: UploadFile) -> Tuple[str, str]:
+    """
+    Copy an upload into a temporary .pdf file without holding it in memory
+    Returns (path, content digest); the caller deletes the file.
+    Uploads over settings.MAX_FILE_SIZE are rejected as soon as they cross it
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    size = 0
+    spool = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    try:
+        with spool:
+            while chunk := await file.read(_UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > settings.MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"PDF exceeds the {settings.MAX_FILE_SIZE // (1024 * 1024)}MB upload limit"
+                    )
+                spool.write(chunk)
+                hasher.update(chunk)
+    except BaseException:
+        os.unlink(spool.name)
+        raise
+    return spool.name, hasher.hexdigest()
+
+
 @router.post("/upload-pdf", response_model=StoreChunkResponse)
 async def upload_and_process_pdf(
     file: UploadFile = File(...),
@@ -49,13 +88,16 @@ async def upload_and_process_pdf(
         # 🟢 CRITICAL FIX: This now gets the REAL Firebase UID
         session_id = current_session["session_id"]
         
-        # Read PDF content
-        pdf_content = await file.read()
+        # Spool the upload to disk in 1 MiB pieces, hashing as it streams
+        pdf_path, file_hash = await _spool_upload(file)
         
         logger.info(f"📄 Processing Legal PDF for User {session_id}: {file.filename}")
         
-        # Enhanced PDF text extraction
-        extraction_result = pdf_service.extract_text_from_pdf(pdf_content)
+        # Enhanced PDF text extraction in the extraction process pool (reads the spooled file)
+        try:
+            extraction_result = await extract_text_from_pdf_async(pdf_path)
+        finally:
+            os.unlink(pdf_path)
         
         if extraction_result['quality_score'] < 2.0:
             logger.warning(f"⚠️ Low quality extraction: {extraction_result['quality_score']}")
@@ -65,17 +107,20 @@ async def upload_and_process_pdf(
             )
         
         # Generate document ID
-        file_hash = hashlib.md5(pdf_content).hexdigest()
-        clean_filename = file.filename.replace('.pdf', '').replace(' ', '_').replace('-', '_')
-        document_id = f"doc_{clean_filename}_{file_hash[:8]}_{int(datetime.now().timestamp())}"
+        # One clock read for the ID, the metadata and the response
+        now = time.time()
+        created_at = datetime.fromtimestamp(now).isoformat()
+        clean_filename = _FILENAME_SEPARATORS_RE.sub('_', file.filename.replace('.pdf', ''))
+        document_id = f"doc_{clean_filename}_{file_hash[:8]}_{int(now)}"
         
         # 🟢 CRITICAL: This ID must match what analysis.py looks for
         session_document_id = f"{session_id}_{document_id}"
         
         logger.info(f"✅ Generated Session Document ID: {session_document_id}")
         
-        # Legal document optimized chunking
-        chunks = vector_service.chunk_legal_document(
+        # Legal document optimized chunking (pure Python; run off the event loop)
+        chunks = await asyncio.to_thread(
+            vector_service.chunk_legal_document,
             extraction_result['text'],
             chunk_size=500,
             overlap=100
@@ -86,7 +131,7 @@ async def upload_and_process_pdf(
             "session_id": session_id,
             "original_document_id": document_id,
             "filename": file.filename,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at,
             "chunk_count": len(chunks),
             "text_length": len(extraction_result['text']),
             "extraction_method": extraction_result['method_used'],
@@ -112,7 +157,7 @@ async def upload_and_process_pdf(
             session_document_id=session_document_id,
             chunks_stored=len(chunks),
             status="success",
-            timestamp=datetime.now().isoformat(),
+            timestamp=created_at,
             session_id=session_id,
             extraction_info={
                 "method": extraction_result['method_used'],
@@ -145,9 +190,12 @@ async def store_document_chunks(
 
         session_id = current_session["session_id"]
         
+        now = time.time()
+        created_at = datetime.fromtimestamp(now).isoformat()
+        
         if not request.document_id:
-            text_hash = hashlib.md5(request.full_text.encode()).hexdigest()
-            request.document_id = f"doc_{text_hash}_{int(datetime.now().timestamp())}"
+            text_hash = hashlib.blake2b(request.full_text.encode(), digest_size=16).hexdigest()
+            request.document_id = f"doc_{text_hash}_{int(now)}"
 
         session_document_id = f"{session_id}_{request.document_id}"
         
@@ -161,7 +209,7 @@ async def store_document_chunks(
         metadata = {
             "session_id": session_id,
             "original_document_id": request.document_id,
-            "created_at": datetime.now().isoformat(),
+            "created_at": created_at,
             "chunk_count": len(chunks),
             "text_length": len(request.full_text),
             "chunk_size_used": request.chunk_size,
@@ -184,7 +232,7 @@ async def store_document_chunks(
             session_document_id=session_document_id,
             chunks_stored=len(chunks),
             status="success",
-            timestamp=datetime.now().isoformat(),
+            timestamp=created_at,
             session_id=session_id,
             extraction_info={
                 "method": "direct_text_input",
@@ -226,13 +274,28 @@ async def get_document_info(
             "index_total_vectors": doc_info.get("index_total_vectors", 0),
             "optimized_for": "legal_documents",
             "optimal_chunks": doc_info.get("chunk_count", 0) >= 3,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
 
     except Exception as e:
         logger.error(f"❌ Failed to get enhanced legal document info: {str(e)}")
         raise HTTPException(status_code=404, detail="Legal document not found")
 
+async def _invalidate_document_caches(session_document_id: str):
+    """
+    Drop a deleted document's cached retrievals (analysis and chat); best effort,
+    the vectors are already gone so a cache failure must not fail the delete
+    """
+    results = await asyncio.gather(
+        retrieval_cache.invalidate_document(session_document_id),
+        chat_retrieval_cache.invalidate_document(session_document_id),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning(f"⚠️ Cache invalidation failed for {session_document_id}: {str(result)}")
+
+
 @router.delete("/document/{document_id}")
 async def delete_document(
     document_id: str,
@@ -249,6 +312,8 @@ async def delete_document(
         if not success:
             raise HTTPException(status_code=500, detail="Failed to delete enhanced legal document")
 
+        await _invalidate_document_caches(session_document_id)
+
         logger.info(f"✅ Successfully deleted enhanced legal document {document_id} (session {session_id})")
 
         return {
@@ -256,7 +321,7 @@ async def delete_document(
             "session_id": session_id,
             "backend": "Pinecone Enhanced Legal",
             "status": "deleted",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
 
     except HTTPException:
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -42,7 +43,6 @@ class Settings(BaseSettings):
    
     
     FIREBASE_PRIVATE_KEY: str = Field(..., env="FIREBASE_PRIVATE_KEY")
-    print("Firebase PRivate Key:", FIREBASE_PRIVATE_KEY)
     FIREBASE_CLIENT_EMAIL: str = Field(..., env="FIREBASE_CLIENT_EMAIL")
     FIREBASE_CLIENT_ID: str = Field(..., env="FIREBASE_CLIENT_ID")
     FIREBASE_AUTH_URI: str = Field(..., env="FIREBASE_AUTH_URI")
@@ -63,4 +63,9 @@ class Settings(BaseSettings):
         case_sensitive = True
         extra = "allow"  # Changed to "allow" to accept extra fields
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Process-wide Settings (the .env file is read once); usable as a FastAPI dependency"""
+    return Settings()
+
+settings = get_settings()
@@ -20,6 +20,8 @@ DB_PORT = os.getenv("DB_PORT", "6543")
 DB_NAME = os.getenv("DB_NAME")
 PROJECT_REF = os.getenv("PROJECT_REF")
 DB_DIRECT_HOST = os.getenv("DB_DIRECT_HOST")
+# SQL statement logging (every statement and its parameters); off unless asked for
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
 
 # Format username for Supabase connection pooler
 def format_username():
@@ -36,11 +38,12 @@ logger.info(f"Database URL: postgresql+asyncpg://{FORMATTED_USER}:***@{DB_HOST}:
 # 🔥 FIXED: Create async engine with ALL necessary Supabase/pgbouncer compatibility settings
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,
+    echo=DB_ECHO,
     pool_pre_ping=True,
     pool_recycle=300,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=20,
+    max_overflow=40,
+    pool_timeout=10,  # Fail fast instead of queueing requests for 30s on a saturated pool
     connect_args={
         "timeout": 30,
         "command_timeout": 10,
@@ -1,20 +1,22 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from app.api.analysis import router as analysis_router
+from fastapi.responses import ORJSONResponse
+from app.api.analysis import router as analysis_router, precompute_query_vectors
 from app.api.chatbot import chatbot_router
 
 from app.api.documents import router as doc_router
-from app.api.auth import authRoutes
-import uvicorn
+from app.api.auth import authRoutes, init_firebase
 import time
 import logging
-from app.api.documents import doc_router  
 from app.config import settings
 from app.database.connection import init_db
 from app.api.translator import router as translator_router
 from app.api.languages import router as lang_router
+from app.services.llm_service import llm_service
+from app.services.vector_service import vector_service
+from app.services.pdf_service import shutdown_extraction_pool
+import asyncio
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +32,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.DEBUG else None,
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(authRoutes, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
@@ -67,7 +70,7 @@ async def add_process_time_header(request: Request, call_next):
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {str(exc)}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error", "type": "server_error"}
     )
@@ -94,6 +97,23 @@ async def startup_event():
         logger.error(f"Database initialization failed: {str(e)}")
         raise e
 
+    # Firebase Admin init (credential parsing) off the import path and the event loop
+    await asyncio.to_thread(init_firebase)
+
+    # Queue LLM calls through a single per-worker dispatcher
+    llm_service.start_dispatcher()
+
+    # Pay model loading and connection setup here instead of on the first request
+    await asyncio.gather(llm_service.warmup(), vector_service.warmup())
+    await asyncio.to_thread(precompute_query_vectors)
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    await llm_service.stop_dispatcher()
+    await llm_service.close()
+    shutdown_extraction_pool()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -106,3 +126,4 @@ async def root():
 @app.head("/")
 async def head_root():
     return {"message": "OK"}
+
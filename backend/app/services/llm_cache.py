@@ -0,0 +1,138 @@
+# llm_cache.py - Redis-backed Exact-Prompt Cache for Parsed LLM Responses
+import hashlib
+import logging
+import time
+from typing import Any, Iterable, Optional
+
+import orjson
+from app.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional - cache degrades to always-miss
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """
+    Exact-match JSON cache; LLM responses are keyed by sha256 of the full prompt.
+    Stored in Redis so every uvicorn worker shares the same entries.
+    Any Redis failure is treated as a miss and briefly disables the cache,
+    so an unavailable Redis never adds latency to the request path.
+    """
+
+    def __init__(self, redis_url: str, prefix: str = "llm:", retry_after: float = 30.0, label: str = "LLM response cache"):
+        self.prefix = prefix
+        self.label = label
+        self.retry_after = retry_after
+        self._disabled_until = 0.0
+        self.client = None
+
+        if aioredis is None:
+            logger.warning(f"⚠️ redis package not installed - {self.label} disabled")
+            return
+        try:
+            self.client = aioredis.from_url(
+                redis_url,
+                socket_connect_timeout=0.5,
+                socket_timeout=0.5
+            )
+            logger.info(f"✅ {self.label} configured with Redis")
+        except Exception as e:
+            logger.warning(f"⚠️ {self.label} disabled: {str(e)}")
+
+    @staticmethod
+    def make_key(prompt: str, system_message: Optional[str] = None) -> str:
+        hasher = hashlib.sha256(prompt.encode())
+        if system_message:
+            hasher.update(b"\x00")
+            hasher.update(system_message.encode())
+        return hasher.hexdigest()
+
+    @staticmethod
+    def make_key_from_parts(prompt_parts: Iterable[bytes], system_message: Optional[bytes] = None) -> str:
+        """
+        Same key as make_key(b"".join(prompt_parts).decode(), ...), hashed piece by
+        piece so constant prompt segments can be pre-encoded once at import time
+        """
+        hasher = hashlib.sha256()
+        for part in prompt_parts:
+            hasher.update(part)
+        if system_message:
+            hasher.update(b"\x00")
+            hasher.update(system_message)
+        return hasher.hexdigest()
+
+    def _available(self) -> bool:
+        return self.client is not None and time.monotonic() >= self._disabled_until
+
+    def _trip(self, error: Exception):
+        self._disabled_until = time.monotonic() + self.retry_after
+        logger.warning(f"⚠️ {self.label} unavailable, bypassing for {self.retry_after:.0f}s: {str(error)}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        if not self._available():
+            return None
+        try:
+            raw = await self.client.get(self.prefix + key)
+        except Exception as e:
+            self._trip(e)
+            return None
+        if raw is None:
+            return None
+        try:
+            value = orjson.loads(raw)
+        except orjson.JSONDecodeError as e:
+            # Corrupt or legacy entry: a miss (it is overwritten by the next set)
+            logger.warning(f"⚠️ {self.label} entry unreadable, ignoring: {key[:12]} ({str(e)})")
+            return None
+        logger.info(f"⚡ {self.label} hit: {key[:12]}")
+        return value
+
+    def _group_key(self, group: str) -> str:
+        return f"{self.prefix}group:{group}"
+
+    async def set(self, key: str, value: Any, ttl: int = 3600, group: Optional[str] = None):
+        """
+        Store value for ttl seconds; keys set with a group can later be removed
+        together with delete_group (the group set outlives its newest member)
+        """
+        if not self._available():
+            return
+        try:
+            if group is None:
+                await self.client.setex(self.prefix + key, ttl, orjson.dumps(value))
+                return
+            group_key = self._group_key(group)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.setex(self.prefix + key, ttl, orjson.dumps(value))
+                pipe.sadd(group_key, self.prefix + key)
+                pipe.expire(group_key, ttl)
+                await pipe.execute()
+        except Exception as e:
+            self._trip(e)
+
+    async def delete(self, *keys: str):
+        if not keys or not self._available():
+            return
+        try:
+            await self.client.delete(*(self.prefix + key for key in keys))
+        except Exception as e:
+            self._trip(e)
+
+    async def delete_group(self, group: str):
+        """Delete every key stored with set(..., group=group)"""
+        if not self._available():
+            return
+        group_key = self._group_key(group)
+        try:
+            members = await self.client.smembers(group_key)
+            await self.client.delete(group_key, *members)
+        except Exception as e:
+            self._trip(e)
+
+
+# Global LLM response cache instance
+llm_cache = LLMResponseCache(settings.REDIS_URL)
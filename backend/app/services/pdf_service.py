@@ -1,7 +1,11 @@
 # pdf_service.py - Robust PDF Text Extraction
 import os
+import asyncio
 import logging
-from typing import Dict, Any, List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional, Union
 import pdfplumber
 import PyPDF2
 import fitz  # PyMuPDF
@@ -10,17 +14,43 @@ from io import BytesIO
 
 logger = logging.getLogger(__name__)
 
+# Patterns used on every extraction, compiled once at import
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_MISSING_SPACE_RE = re.compile(r'([a-z])([A-Z])')
+_GARBLED_CHAR_RE = re.compile(r'[^\w\s.,-:;()\[\]{}"\']')
+_WHITESPACE_RE = re.compile(r'\s+')
+_HYPHEN_BREAK_RE = re.compile(r'(\w)-\s*\n\s*(\w)')
+_NEWLINES_RE = re.compile(r'\n+')
+_PAGE_NUMBER_RE = re.compile(r'^\d+$')
+
+# PDF bytes, or the path of a PDF file (uploads are spooled to disk)
+PDFSource = Union[bytes, str]
+
+
+def _as_file(pdf_content: PDFSource):
+    """Path or in-memory file object, whichever the PDF libraries should open"""
+    return pdf_content if isinstance(pdf_content, str) else BytesIO(pdf_content)
+
+
+# An extraction scoring at least this (coherent sentences with proper spacing)
+# is kept as-is; the slower extractors only run when the faster ones fall short
+GOOD_EXTRACTION_SCORE = 5.0
+
 class EnhancedPDFService:
     def __init__(self):
+        # Fastest first: PyMuPDF is several times faster than pdfplumber/PyPDF2
         self.extraction_methods = [
+            self._extract_with_pymupdf,
             self._extract_with_pdfplumber,
-            self._extract_with_pymupdf, 
             self._extract_with_pypdf2
         ]
     
-    def extract_text_from_pdf(self, pdf_content: bytes) -> Dict[str, Any]:
+    def extract_text_from_pdf(self, pdf_content: PDFSource) -> Dict[str, Any]:
         """
         Extract clean text from PDF using multiple methods with fallbacks
+        pdf_content is the PDF bytes or the path of a PDF file
+        Stops at the first method whose output scores GOOD_EXTRACTION_SCORE;
+        otherwise the best-scoring extraction is used
         """
         best_extraction = None
         best_score = 0
@@ -35,6 +65,8 @@ class EnhancedPDFService:
                 if score > best_score:
                     best_score = score
                     best_extraction = result
+                if score >= GOOD_EXTRACTION_SCORE:
+                    break
                     
             except Exception as e:
                 logger.warning(f"Method {method.__name__} failed: {str(e)}")
@@ -52,9 +84,9 @@ class EnhancedPDFService:
         else:
             raise Exception("All PDF extraction methods failed")
     
-    def _extract_with_pdfplumber(self, pdf_content: bytes) -> Dict[str, Any]:
+    def _extract_with_pdfplumber(self, pdf_content: PDFSource) -> Dict[str, Any]:
         """Extract using pdfplumber - best for formatted documents"""
-        with pdfplumber.open(BytesIO(pdf_content)) as pdf:
+        with pdfplumber.open(_as_file(pdf_content)) as pdf:
             text_parts = []
             for page in pdf.pages:
                 page_text = page.extract_text()
@@ -67,27 +99,26 @@ class EnhancedPDFService:
                 'page_count': len(pdf.pages)
             }
     
-    def _extract_with_pymupdf(self, pdf_content: bytes) -> Dict[str, Any]:
+    def _extract_with_pymupdf(self, pdf_content: PDFSource) -> Dict[str, Any]:
         """Extract using PyMuPDF - good for complex layouts"""
-        doc = fitz.open(stream=pdf_content, filetype="pdf")
-        text_parts = []
-        
-        for page_num in range(doc.page_count):
-            page = doc[page_num]
-            page_text = page.get_text()
-            if page_text.strip():
-                text_parts.append(page_text)
-        
-        doc.close()
-        return {
-            'text': '\n\n'.join(text_parts),
-            'method': 'pymupdf',
-            'page_count': len(text_parts)
-        }
+        opened = fitz.open(pdf_content) if isinstance(pdf_content, str) else fitz.open(stream=pdf_content, filetype="pdf")
+        with opened as doc:
+            text_parts = []
+            
+            for page in doc:
+                page_text = page.get_text("text")
+                if page_text.strip():
+                    text_parts.append(page_text)
+            
+            return {
+                'text': '\n\n'.join(text_parts),
+                'method': 'pymupdf',
+                'page_count': doc.page_count
+            }
     
-    def _extract_with_pypdf2(self, pdf_content: bytes) -> Dict[str, Any]:
+    def _extract_with_pypdf2(self, pdf_content: PDFSource) -> Dict[str, Any]:
         """Extract using PyPDF2 - fallback method"""
-        reader = PyPDF2.PdfReader(BytesIO(pdf_content))
+        reader = PyPDF2.PdfReader(_as_file(pdf_content))
         text_parts = []
         
         for page in reader.pages:
@@ -109,21 +140,22 @@ class EnhancedPDFService:
         score = 0.0
         
         # Check for coherent sentences
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         valid_sentences = [s for s in sentences if len(s.strip().split()) > 3]
         score += min(len(valid_sentences) / 10, 3.0)
         
         # Check for proper spacing
-        if not re.search(r'[a-z][A-Z]', text):  # No missing spaces
+        if not _MISSING_SPACE_RE.search(text):  # No missing spaces
             score += 2.0
         
         # Check for legal document indicators
         legal_terms = ['agreement', 'contract', 'terms', 'conditions', 'party', 'obligations']
-        found_terms = sum(1 for term in legal_terms if term.lower() in text.lower())
+        text_lower = text.lower()
+        found_terms = sum(1 for term in legal_terms if term in text_lower)
         score += found_terms * 0.5
         
         # Penalize garbled text
-        if re.search(r'[^\w\s.,-:;()\[\]{}"\']', text):
+        if _GARBLED_CHAR_RE.search(text):
             score -= 1.0
         
         return max(0.0, score)
@@ -131,12 +163,12 @@ class EnhancedPDFService:
     def _clean_extracted_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Fix common PDF extraction issues
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)  # Add missing spaces
-        text = re.sub(r'(\w)-\s*\n\s*(\w)', r'\1\2', text)  # Fix hyphenated words
-        text = re.sub(r'\n+', '\n', text)  # Remove excessive newlines
+        text = _MISSING_SPACE_RE.sub(r'\1 \2', text)  # Add missing spaces
+        text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)  # Fix hyphenated words
+        text = _NEWLINES_RE.sub('\n', text)  # Remove excessive newlines
         
         # Remove headers/footers (common patterns)
         lines = text.split('\n')
@@ -146,7 +178,7 @@ class EnhancedPDFService:
             line = line.strip()
             # Skip likely headers/footers
             if (len(line) < 5 or 
-                re.match(r'^\d+$', line) or  # Page numbers
+                _PAGE_NUMBER_RE.match(line) or  # Page numbers
                 'confidential' in line.lower() and len(line) < 50):
                 continue
             cleaned_lines.append(line)
@@ -155,3 +187,52 @@ class EnhancedPDFService:
 
 # Global PDF service instance
 pdf_service = EnhancedPDFService()
+
+
+# ============================================================================
+# PROCESS POOL EXTRACTION (keeps CPU-bound parsing off the event loop)
+# ============================================================================
+
+# Extraction processes per uvicorn worker; parsing is pure CPU, so more than this
+# only competes with the embedding threads
+PDF_EXTRACTION_PROCESSES = max(1, (os.cpu_count() or 2) // 2)
+
+_extraction_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_extraction_pool() -> ProcessPoolExecutor:
+    global _extraction_pool
+    if _extraction_pool is None:
+        # spawn: children start clean instead of forking the threaded server process; they
+        # import this module and the __main__ module (keep app.main out of __main__)
+        _extraction_pool = ProcessPoolExecutor(
+            max_workers=PDF_EXTRACTION_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"✅ PDF extraction pool started ({PDF_EXTRACTION_PROCESSES} processes)")
+    return _extraction_pool
+
+
+async def extract_text_from_pdf_async(pdf_content: PDFSource) -> Dict[str, Any]:
+    """
+    pdf_service.extract_text_from_pdf in the extraction process pool (in a thread
+    if the pool is broken). Pass a file path for large PDFs: only the path crosses
+    the process boundary
+    """
+    global _extraction_pool
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_extraction_pool(), pdf_service.extract_text_from_pdf, pdf_content
+        )
+    except BrokenProcessPool as e:
+        logger.warning(f"⚠️ PDF extraction pool broken, extracting in a thread: {str(e)}")
+        _extraction_pool = None
+        return await asyncio.to_thread(pdf_service.extract_text_from_pdf, pdf_content)
+
+
+def shutdown_extraction_pool():
+    """Stop the extraction processes (FastAPI shutdown hook)"""
+    global _extraction_pool
+    if _extraction_pool is not None:
+        _extraction_pool.shutdown(cancel_futures=True)
+        _extraction_pool = None
@@ -0,0 +1,112 @@
+# retrieval_cache.py - Two-Level TTL Cache for Retrieved + Formatted Chunks
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.config import settings
+from app.services.llm_cache import LLMResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Analysis types whose retrievals are cached (matches ANALYSIS_CONFIGS in app/api/analysis.py)
+CACHED_ANALYSIS_TYPES = ("risk", "negotiation", "summary")
+
+
+class RetrievalCache:
+    """
+    Bounded LRU cache with a per-entry TTL for (formatted_chunks, chunks) pairs.
+    Analysis queries are fixed per analysis type, so the same document and
+    analysis type always retrieve the same context; repeat requests can skip
+    the vector DB round trips and prompt formatting entirely.
+
+    Entries are also written to Redis (when available) so a document analysed
+    on one uvicorn worker is a hit on every other worker.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 512,
+        ttl: float = 900.0,
+        shared: Optional[LLMResponseCache] = None,
+        shared_ttl: int = 3600
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        # (document_id, analysis_type) -> (expires_at, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[str, List[Dict[str, Any]]]]]" = OrderedDict()
+
+    @staticmethod
+    def _shared_key(key: Tuple[str, str]) -> str:
+        document_id, analysis_type = key
+        return f"{analysis_type}:{document_id}"
+
+    def _get_local(self, key: Hashable) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, key: Hashable, value: Tuple[str, List[Dict[str, Any]]]):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: Tuple[str, str]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        value = self._get_local(key)
+        if value is not None or self.shared is None:
+            return value
+
+        stored = await self.shared.get(self._shared_key(key))
+        if stored is None:
+            return None
+        value = (stored[0], stored[1])
+        self._put_local(key, value)
+        return value
+
+    async def put(self, key: Tuple[str, str], value: Tuple[str, List[Dict[str, Any]]]):
+        self._put_local(key, value)
+        if self.shared is not None:
+            await self.shared.set(self._shared_key(key), value, ttl=self.shared_ttl, group=key[0])
+
+    async def invalidate_document(self, document_id: str):
+        """Drop every cached retrieval for a document, locally and in Redis (e.g. after deletion)"""
+        stale = [key for key in self._entries if key[0] == document_id]
+        for key in stale:
+            del self._entries[key]
+        if self.shared is not None:
+            # Keys are tracked per document on put (chat keys embed a message digest,
+            # so they cannot be derived here); the fixed analysis keys are also
+            # deleted directly in case they predate that tracking
+            await self.shared.delete_group(document_id)
+            await self.shared.delete(*(
+                self._shared_key((document_id, analysis_type)) for analysis_type in CACHED_ANALYSIS_TYPES
+            ))
+        if stale:
+            logger.info(f"🗑️ Dropped {len(stale)} cached retrievals for {document_id}")
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Global retrieval cache instance, keyed by (session_document_id, analysis_type)
+retrieval_cache = RetrievalCache(
+    shared=LLMResponseCache(settings.REDIS_URL, prefix="retr:", label="Retrieval cache")
+)
+
+# Chat retrievals, keyed by (session_document_id, "chat:<question_type>:<message digest>");
+# a shorter TTL since chat questions are far less repetitive than analysis types
+chat_retrieval_cache = RetrievalCache(
+    maxsize=2048,
+    ttl=600.0,
+    shared=LLMResponseCache(settings.REDIS_URL, prefix="rag:", label="Chat retrieval cache"),
+    shared_ttl=600
+)
@@ -0,0 +1,130 @@
+# semantic_cache.py - LSH Semantic Cache for LLM Analysis Results
+import copy
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Hashable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LSHSemanticCache:
+    """
+    Approximate-match cache for parsed LLM analysis results.
+
+    Embeddings are hashed with random hyperplane projections (sign LSH) across
+    several tables. Entries sharing a bucket with the query are confirmed with
+    an exact cosine similarity check, so only near-duplicate inputs hit.
+    """
+
+    def __init__(
+        self,
+        dim: int = 384,
+        num_tables: int = 8,
+        num_bits: int = 12,
+        threshold: float = 0.97,
+        max_entries: int = 2048,
+        seed: int = 42
+    ):
+        rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # (tables, bits, dim) projection matrices, one hyperplane per signature bit
+        self.planes = rng.standard_normal((num_tables, num_bits, dim)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(num_bits)).astype(np.int64)
+        self.tables: List[Dict[Tuple[Hashable, int], List[int]]] = [{} for _ in range(num_tables)]
+        # entry_id -> (namespace, signatures, unit vector, cached response)
+        self._entries: "OrderedDict[int, Tuple[Hashable, np.ndarray, np.ndarray, Dict[str, Any]]]" = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _normalize(self, vector) -> Optional[np.ndarray]:
+        if vector is None:
+            return None
+        vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vec.shape[0] != self.dim:
+            logger.warning(f"⚠️ Semantic cache dimension mismatch: {vec.shape[0]} != {self.dim}")
+            return None
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            return None
+        return vec / norm
+
+    def _signatures(self, unit_vec: np.ndarray) -> np.ndarray:
+        """One integer bucket signature per table"""
+        bits = (self.planes @ unit_vec) > 0  # (tables, bits)
+        return bits.astype(np.int64) @ self._bit_weights
+
+    def get(self, namespace: Hashable, vector) -> Optional[Dict[str, Any]]:
+        """Return a copy of the best cached response above the similarity threshold"""
+        unit_vec = self._normalize(vector)
+        if unit_vec is None:
+            return None
+
+        candidate_ids = set()
+        for table, signature in zip(self.tables, self._signatures(unit_vec)):
+            candidate_ids.update(table.get((namespace, int(signature)), ()))
+
+        best_id, best_score = None, self.threshold
+        for entry_id in candidate_ids:
+            cached_vec = self._entries[entry_id][2]
+            score = float(cached_vec @ unit_vec)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_id)
+        logger.info(f"⚡ Semantic cache hit for {namespace} (similarity: {best_score:.4f})")
+        return copy.deepcopy(self._entries[best_id][3])
+
+    def put(self, namespace: Hashable, vector, response: Dict[str, Any]):
+        """Store a parsed response under the LSH buckets of its embedding"""
+        unit_vec = self._normalize(vector)
+        if unit_vec is None:
+            return
+
+        signatures = self._signatures(unit_vec)
+        entry_id = self._next_id
+        self._next_id += 1
+
+        for table, signature in zip(self.tables, signatures):
+            table.setdefault((namespace, int(signature)), []).append(entry_id)
+        self._entries[entry_id] = (namespace, signatures, unit_vec, copy.deepcopy(response))
+
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        entry_id, (namespace, signatures, _, _) = self._entries.popitem(last=False)
+        for table, signature in zip(self.tables, signatures):
+            key = (namespace, int(signature))
+            bucket = table.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(entry_id)
+            if not bucket:
+                del table[key]
+
+    def clear(self):
+        for table in self.tables:
+            table.clear()
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "threshold": self.threshold
+        }
+
+
+# Global semantic cache instance (384-dim to match the FastEmbed bge-small model)
+semantic_cache = LSHSemanticCache()
@@ -9,11 +9,29 @@ from fastembed import TextEmbedding  # Lightweight replacement for sentence-tran
 import hashlib
 from datetime import datetime
 from app.config import settings
-import time
 import re
+import asyncio
+from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
 
+# Concurrent embedding passes per worker; more than this just thrash the CPU
+EMBED_CONCURRENCY = max(1, (os.cpu_count() or 2) // 2)
+# Recently embedded query strings (fixed analysis queries, repeated chat questions)
+QUERY_EMBEDDING_CACHE_SIZE = 512
+# Document upserts: vectors per Pinecone request, and requests in flight at once
+UPSERT_BATCH_SIZE = 100
+UPSERT_CONCURRENCY = 8
+
+# Legal section boundaries, most structural first; compiled once at import
+_SECTION_PATTERNS = [
+    re.compile(r'\n\d+\.\s+[A-Z][^\.]*\n'),  # Numbered sections like "1. POSITION"
+    re.compile(r'\n[A-Z][A-Z\s]+:\s*\n'),    # ALL CAPS headers like "CONFIDENTIALITY:"
+    re.compile(r'\n\([a-z]\)\s+'),            # (a) subsections
+    re.compile(r'\n\([0-9]+\)\s+')           # (1) subsections
+]
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+
 class VectorService:
     
     def __init__(self):
@@ -37,6 +55,10 @@ class VectorService:
             
         self.target_dimension = 384  # Match your actual Pinecone index dimension
         
+        # Embedding runs in worker threads, at most EMBED_CONCURRENCY passes at a time
+        self._embed_semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
         logger.info(f"✅ Initialized Enhanced VectorService with index: {self.index_name}, dimension: {self.target_dimension}")
 
     def chunk_legal_document(self, text: str, chunk_size: int = 500, overlap: int = 100) -> List[Dict[str, Any]]:
@@ -45,22 +67,12 @@ class VectorService:
         """
         logger.info(f"📄 Legal document chunking: {len(text)} characters")
         
-        # Split by legal sections first
-        section_patterns = [
-            r'\n\d+\.\s+[A-Z][^\.]*\n',  # Numbered sections like "1. POSITION"
-            r'\n[A-Z][A-Z\s]+:\s*\n',    # ALL CAPS headers like "CONFIDENTIALITY:"
-            r'\n\([a-z]\)\s+',            # (a) subsections
-            r'\n\([0-9]+\)\s+'           # (1) subsections
-        ]
-        
         sections = []
-        current_text = text
         
-        # Try to split by legal sections
-        for pattern in section_patterns:
-            matches = list(re.finditer(pattern, current_text))
-            if matches:
-                parts = re.split(pattern, current_text)
+        # Split by legal sections first, using the first pattern that occurs
+        for pattern in _SECTION_PATTERNS:
+            if pattern.search(text):
+                parts = pattern.split(text)
                 sections = [part.strip() for part in parts if part.strip() and len(part.strip()) > 20]
                 logger.info(f"📋 Split into {len(sections)} legal sections using pattern")
                 break
@@ -73,41 +85,47 @@ class VectorService:
             
         if not sections:
             # Ultimate fallback - sentence splitting
-            sentences = re.split(r'[.!?]+', text)
+            sentences = _SENTENCE_SPLIT_RE.split(text)
             sections = [s.strip() for s in sentences if len(s.strip()) > 30]
             logger.info(f"📋 Split into {len(sections)} sentences (ultimate fallback)")
         
         # Now chunk sections intelligently
+        # Word counts are tracked incrementally; re-splitting the growing chunk for
+        # every section made this quadratic in the document length
         chunks = []
         current_chunk = ""
+        current_word_count = 0
         chunk_index = 0
         
         for section in sections:
             words = section.split()
             
             # If adding this section would exceed chunk size
-            if len((current_chunk + " " + section).split()) > chunk_size and current_chunk:
+            if current_word_count + len(words) > chunk_size and current_chunk:
                 # Save current chunk
                 chunks.append({
                     "id": hashlib.md5(f"{current_chunk[:100]}{chunk_index}".encode()).hexdigest(),
                     "text": current_chunk.strip(),
                     "chunk_index": chunk_index,
-                    "word_count": len(current_chunk.split()),
+                    "word_count": current_word_count,
                     "section_type": "legal_section",
                     "start_word": 0,  # Will be calculated later
-                    "end_word": len(current_chunk.split())
+                    "end_word": current_word_count
                 })
                 
                 # Start new chunk with overlap
-                if overlap > 0 and len(current_chunk.split()) > overlap:
+                if overlap > 0 and current_word_count > overlap:
                     overlap_words = current_chunk.split()[-overlap:]
                     current_chunk = " ".join(overlap_words) + " " + section
+                    current_word_count = overlap + len(words)
                 else:
                     current_chunk = section
+                    current_word_count = len(words)
                 chunk_index += 1
             else:
                 # Add section to current chunk
                 current_chunk = (current_chunk + " " + section).strip()
+                current_word_count += len(words)
         
         # Add final chunk
         if current_chunk:
@@ -115,10 +133,10 @@ class VectorService:
                 "id": hashlib.md5(f"{current_chunk[:100]}{chunk_index}".encode()).hexdigest(),
                 "text": current_chunk.strip(),
                 "chunk_index": chunk_index,
-                "word_count": len(current_chunk.split()),
+                "word_count": current_word_count,
                 "section_type": "legal_section",
                 "start_word": 0,
-                "end_word": len(current_chunk.split())
+                "end_word": current_word_count
             })
         
         # ✅ ENSURE MINIMUM 3 CHUNKS for legal documents
@@ -218,6 +236,35 @@ class VectorService:
             logger.error(f"Failed to create embeddings: {str(e)}")
             raise
 
+    async def create_embeddings_async(self, texts: List[str]) -> np.ndarray:
+        """create_embeddings in a worker thread, throttled by the shared embedding semaphore"""
+        async with self._embed_semaphore:
+            return await asyncio.to_thread(self.create_embeddings, texts)
+
+    async def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Query embeddings (one row per query) with an LRU over query strings;
+        only the misses are encoded, in a single throttled pass
+        """
+        cache = self._query_embeddings
+        # Rows come from this local map: entries may be evicted from the shared
+        # cache (by this call or a concurrent one) while the misses are encoded
+        embeddings: Dict[str, np.ndarray] = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            if query in cache:
+                cache.move_to_end(query)
+                embeddings[query] = cache[query]
+            else:
+                missing.append(query)
+        if missing:
+            for query, embedding in zip(missing, await self.create_embeddings_async(missing)):
+                embeddings[query] = embedding
+                cache[query] = embedding
+            while len(cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                cache.popitem(last=False)
+        return np.stack([embeddings[query] for query in queries])
+
     def _create_fallback_embeddings(self, texts: List[str]) -> np.ndarray:
         """Ultra-lightweight fallback embedding method using TF-IDF approach"""
         from collections import Counter
@@ -256,75 +303,78 @@ class VectorService:
         
         return np.array(embeddings, dtype=np.float32)
 
+    def _chunk_vector(self, document_id: str, chunk: Dict[str, Any], embedding: np.ndarray, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Pinecone vector (id, values, metadata) for one document chunk"""
+        # Prepare metadata (Pinecone has metadata size limits)
+        chunk_metadata = {
+            "document_id": document_id,
+            "chunk_index": chunk["chunk_index"],
+            "text": chunk["text"][:1000],  # Limit to 1000 chars for metadata
+            "word_count": chunk["word_count"],
+            "start_word": chunk.get("start_word", 0),
+            "end_word": chunk.get("end_word", 0),
+            "section_type": chunk.get("section_type", "standard"),
+            "created_at": datetime.now().isoformat()
+        }
+        
+        # Add additional metadata if provided
+        if metadata:
+            for key, value in metadata.items():
+                if key not in chunk_metadata:
+                    chunk_metadata[key] = str(value)[:500]
+        
+        # Verify vector dimension before adding
+        vector_values = embedding.tolist()
+        if len(vector_values) != self.target_dimension:
+            raise ValueError(f"Vector dimension {len(vector_values)} doesn't match target {self.target_dimension}")
+        
+        return {
+            "id": f"{document_id}_{chunk['id']}",
+            "values": vector_values,
+            "metadata": chunk_metadata
+        }
+
     async def store_document_chunks(self, document_id: str, chunks: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None) -> bool:
-        """Store document chunks in Pinecone with enhanced debugging"""
+        """
+        Store document chunks in Pinecone with enhanced debugging
+        Chunks are embedded one UPSERT_BATCH_SIZE batch per model pass, and each batch
+        is upserted while the next one embeds (up to UPSERT_CONCURRENCY in flight)
+        """
+        upserts: List[asyncio.Task] = []
         try:
             if not chunks:
                 logger.warning("No chunks provided for storage")
                 return False
-                
-            vectors_to_upsert = []
-            
-            # Process chunks in batches for embedding generation
-            chunk_texts = [chunk["text"] for chunk in chunks]
-            embeddings = self.create_embeddings(chunk_texts)
             
             logger.info(f"🔧 STORING ENHANCED LEGAL DOCUMENT: {document_id}")
-            logger.info(f"📊 Generated embeddings shape: {embeddings.shape} for {len(chunks)} chunks")
             
-            for i, chunk in enumerate(chunks):
-                # Prepare metadata (Pinecone has metadata size limits)
-                chunk_metadata = {
-                    "document_id": document_id,
-                    "chunk_index": chunk["chunk_index"],
-                    "text": chunk["text"][:1000],  # Limit to 1000 chars for metadata
-                    "word_count": chunk["word_count"],
-                    "start_word": chunk.get("start_word", 0),
-                    "end_word": chunk.get("end_word", 0),
-                    "section_type": chunk.get("section_type", "standard"),
-                    "created_at": datetime.now().isoformat()
-                }
-                
-                # Add additional metadata if provided
-                if metadata:
-                    for key, value in metadata.items():
-                        if key not in chunk_metadata:
-                            chunk_metadata[key] = str(value)[:500]
+            chunk_batches = [
+                chunks[batch_idx:batch_idx + UPSERT_BATCH_SIZE]
+                for batch_idx in range(0, len(chunks), UPSERT_BATCH_SIZE)
+            ]
+            upsert_slots = asyncio.Semaphore(UPSERT_CONCURRENCY)
+            
+            async def upsert_batch(current_batch: int, batch: List[Dict[str, Any]]):
+                async with upsert_slots:
+                    logger.info(f"⬆️ Upserting batch {current_batch}/{len(chunk_batches)} ({len(batch)} vectors)")
+                    upsert_response = await asyncio.to_thread(self.index.upsert, vectors=batch, namespace="")
+                    logger.info(f"✅ Batch {current_batch} upserted successfully: {upsert_response}")
+            
+            for current_batch, chunk_batch in enumerate(chunk_batches, start=1):
+                embeddings = await self.create_embeddings_async([chunk["text"] for chunk in chunk_batch])
+                logger.info(f"📊 Generated embeddings shape: {embeddings.shape} for batch {current_batch}/{len(chunk_batches)}")
                 
-                # Verify vector dimension before adding
-                vector_values = embeddings[i].tolist()
-                if len(vector_values) != self.target_dimension:
-                    raise ValueError(f"Vector dimension {len(vector_values)} doesn't match target {self.target_dimension}")
-                
-                vector_id = f"{document_id}_{chunk['id']}"
-                vectors_to_upsert.append({
-                    "id": vector_id,
-                    "values": vector_values,
-                    "metadata": chunk_metadata
-                })
-                
-                logger.info(f"📦 Prepared vector {i+1}/{len(chunks)}: {vector_id}")
+                vectors = [
+                    self._chunk_vector(document_id, chunk, embedding, metadata)
+                    for chunk, embedding in zip(chunk_batch, embeddings)
+                ]
+                upserts.append(asyncio.create_task(upsert_batch(current_batch, vectors)))
             
-            # Upsert in batches to avoid rate limits
-            batch_size = 100
-            total_batches = (len(vectors_to_upsert) + batch_size - 1) // batch_size
+            await asyncio.gather(*upserts)
             
-            for batch_idx in range(0, len(vectors_to_upsert), batch_size):
-                batch = vectors_to_upsert[batch_idx:batch_idx + batch_size]
-                current_batch = (batch_idx // batch_size) + 1
-                
-                logger.info(f"⬆️ Upserting batch {current_batch}/{total_batches} ({len(batch)} vectors)")
-                
-                upsert_response = self.index.upsert(
-                    vectors=batch,
-                    namespace=""
-                )
-                
-                logger.info(f"✅ Batch {current_batch} upserted successfully: {upsert_response}")
-            
-            # Wait for index to propagate
+            # Wait for index to propagate (without blocking the event loop)
             logger.info("⏳ Waiting 5 seconds for index propagation...")
-            time.sleep(5)
+            await asyncio.sleep(5)
             
             # Verify the stored data
             await self._verify_stored_document(document_id, len(chunks))
@@ -333,6 +383,8 @@ class VectorService:
             return True
             
         except Exception as e:
+            for upsert in upserts:
+                upsert.cancel()
             logger.error(f"❌ Failed to store enhanced legal document: {str(e)}")
             return False
 
@@ -343,65 +395,125 @@ class VectorService:
                 logger.warning("Empty query provided")
                 return []
             
-            # Create query embedding
-            query_embedding = self.create_embeddings([query])[0]
-            
-            # Verify query embedding dimension
-            if len(query_embedding) != self.target_dimension:
-                raise ValueError(f"Query embedding dimension {len(query_embedding)} doesn't match target {self.target_dimension}")
-            
-            logger.info(f"🔍 ENHANCED LEGAL DOCUMENT SEARCH:")
-            logger.info(f"   Query: '{query[:50]}...'")
-            logger.info(f"   Document ID: '{document_id}'")
-            logger.info(f"   Top K: {top_k}")
-            
-            # Enhanced search strategy for legal documents
-            search_results = await self._search_legal_document(query_embedding, document_id, top_k)
+            # Create query embedding (cached per query string)
+            query_embedding = (await self.embed_queries([query]))[0]
             
-            logger.info(f"📊 Pinecone returned {len(search_results.matches)} matches for legal document")
-            
-            if len(search_results.matches) == 0:
-                await self._debug_no_matches(document_id, query_embedding, top_k)
-                return []
-            
-            relevant_chunks = []
-            for match in search_results.matches:
-                chunk_data = {
-                    "id": match.id,
-                    "text": match.metadata.get("text", ""),
-                    "score": float(match.score),
-                    "chunk_index": match.metadata.get("chunk_index", 0),
-                    "word_count": match.metadata.get("word_count", 0),
-                    "start_word": match.metadata.get("start_word", 0),
-                    "end_word": match.metadata.get("end_word", 0),
-                    "section_type": match.metadata.get("section_type", "standard")
-                }
-                relevant_chunks.append(chunk_data)
-                logger.debug(f"   Match: {match.id}, Score: {match.score:.4f}, Type: {chunk_data['section_type']}")
-            
-            # Sort by chunk index to maintain document flow
-            relevant_chunks.sort(key=lambda x: x["chunk_index"])
-            
-            # Ensure we get good coverage for legal documents
-            if len(relevant_chunks) < 3:
-                logger.info("📝 Legal document: Ensuring minimum coverage...")
-                additional_results = await self._get_all_document_chunks(document_id, exclude_ids=[c["id"] for c in relevant_chunks])
-                relevant_chunks.extend(additional_results[:5-len(relevant_chunks)])
-            
-            logger.info(f"✅ Retrieved {len(relevant_chunks)} relevant chunks from legal document")
-            return relevant_chunks[:top_k]
+            return await self._retrieve_with_embedding(query, query_embedding, document_id, top_k)
             
         except Exception as e:
             logger.error(f"❌ Failed to retrieve chunks from legal document: {str(e)}")
             return []
 
+    async def retrieve_relevant_chunks_by_vector(self, vector, document_id: str, top_k: int = 10, query: str = "") -> List[Dict[str, Any]]:
+        """Chunk retrieval for a precomputed query embedding (skips the encoder); query is only logged"""
+        try:
+            return await self._retrieve_with_embedding(query, np.asarray(vector), document_id, top_k)
+        except Exception as e:
+            logger.error(f"❌ Failed to retrieve chunks from legal document: {str(e)}")
+            return []
+
+    async def retrieve_relevant_chunks_batch(
+        self,
+        queries: List[str],
+        document_id: str,
+        top_ks: List[int],
+        query_embeddings: Optional[np.ndarray] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve chunks for several queries against one document.
+        All queries are embedded in a single model pass (or query_embeddings, one
+        row per query, is used as-is) and the Pinecone searches run concurrently;
+        results come back in query order (empty list on failure).
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        positions = [i for i, query in enumerate(queries) if query.strip()]
+        if not positions:
+            logger.warning("Empty query batch provided")
+            return results
+        
+        if query_embeddings is not None:
+            query_embeddings = [query_embeddings[i] for i in positions]
+        else:
+            try:
+                query_embeddings = await self.embed_queries([queries[i] for i in positions])
+            except Exception as e:
+                logger.error(f"❌ Failed to embed query batch: {str(e)}")
+                return results
+        
+        retrieved = await asyncio.gather(*(
+            self._retrieve_with_embedding(queries[i], embedding, document_id, top_ks[i])
+            for i, embedding in zip(positions, query_embeddings)
+        ), return_exceptions=True)
+        
+        for i, chunks in zip(positions, retrieved):
+            if isinstance(chunks, Exception):
+                logger.error(f"❌ Query {i+1} '{queries[i][:40]}...' failed: {str(chunks)}")
+                continue
+            results[i] = chunks
+        return results
+
+    async def _retrieve_with_embedding(self, query: str, query_embedding, document_id: str, top_k: int) -> List[Dict[str, Any]]:
+        """Search, shape and order chunks for an already-embedded query"""
+        # Verify query embedding dimension
+        if len(query_embedding) != self.target_dimension:
+            raise ValueError(f"Query embedding dimension {len(query_embedding)} doesn't match target {self.target_dimension}")
+        
+        logger.info(f"🔍 ENHANCED LEGAL DOCUMENT SEARCH:")
+        logger.info(f"   Query: '{query[:50]}...'")
+        logger.info(f"   Document ID: '{document_id}'")
+        logger.info(f"   Top K: {top_k}")
+        
+        # Enhanced search strategy for legal documents
+        search_results = await self._search_legal_document(query_embedding, document_id, top_k)
+        
+        logger.info(f"📊 Pinecone returned {len(search_results.matches)} matches for legal document")
+        
+        if len(search_results.matches) == 0:
+            await self._debug_no_matches(document_id, query_embedding, top_k)
+            return []
+        
+        # Keep the top_k best-scoring matches (O(n) selection), then restore document order
+        matches = search_results.matches
+        if 0 < top_k < len(matches):
+            scores = np.fromiter((match.score for match in matches), dtype=np.float32, count=len(matches))
+            matches = [matches[i] for i in np.argpartition(-scores, top_k - 1)[:top_k]]
+        
+        relevant_chunks = []
+        for match in matches:
+            chunk_data = {
+                "id": match.id,
+                "text": match.metadata.get("text", ""),
+                "score": float(match.score),
+                "chunk_index": match.metadata.get("chunk_index", 0),
+                "word_count": match.metadata.get("word_count", 0),
+                "start_word": match.metadata.get("start_word", 0),
+                "end_word": match.metadata.get("end_word", 0),
+                "section_type": match.metadata.get("section_type", "standard")
+            }
+            relevant_chunks.append(chunk_data)
+            logger.debug(f"   Match: {match.id}, Score: {match.score:.4f}, Type: {chunk_data['section_type']}")
+        
+        # Sort by chunk index to maintain document flow
+        relevant_chunks.sort(key=lambda x: x["chunk_index"])
+        
+        # Ensure we get good coverage for legal documents
+        if len(relevant_chunks) < 3:
+            logger.info("📝 Legal document: Ensuring minimum coverage...")
+            additional_results = await self._get_all_document_chunks(document_id, exclude_ids=[c["id"] for c in relevant_chunks])
+            relevant_chunks.extend(additional_results[:5-len(relevant_chunks)])
+        
+        logger.info(f"✅ Retrieved {len(relevant_chunks)} relevant chunks from legal document")
+        return relevant_chunks[:top_k]
+
     async def _search_legal_document(self, query_embedding, document_id: str, top_k: int):
         """Specialized search for legal documents"""
         # Strategy 1: Direct search with higher top_k for better coverage
         try:
             logger.info("🎯 Legal Document Strategy: Enhanced coverage search")
             
-            search_results = self.index.query(
+            # Run the blocking Pinecone call in a thread so batched queries overlap
+            search_results = await asyncio.to_thread(
+                self.index.query,
                 vector=query_embedding.tolist(),
                 filter={"document_id": {"$eq": document_id}},
                 top_k=min(top_k * 2, 50),  # Get more results for legal docs
@@ -426,7 +538,8 @@ class VectorService:
         try:
             logger.info("🎯 Strategy 1: Exact document_id filter")
             
-            search_results = self.index.query(
+            search_results = await asyncio.to_thread(
+                self.index.query,
                 vector=query_embedding.tolist(),
                 filter={"document_id": {"$eq": document_id}},
                 top_k=top_k * 2,
@@ -446,7 +559,8 @@ class VectorService:
         try:
             logger.info("🎯 Strategy 2: Broad search with manual filtering")
             
-            search_results = self.index.query(
+            search_results = await asyncio.to_thread(
+                self.index.query,
                 vector=query_embedding.tolist(),
                 top_k=top_k * 3,
                 include_metadata=True,
@@ -480,7 +594,8 @@ class VectorService:
             # Use a dummy vector to get all chunks for this document
             dummy_vector = [0.1] * self.target_dimension
             
-            all_chunks_response = self.index.query(
+            all_chunks_response = await asyncio.to_thread(
+                self.index.query,
                 vector=dummy_vector,
                 filter={"document_id": {"$eq": document_id}},
                 top_k=50,
@@ -518,7 +633,8 @@ class VectorService:
             logger.info(f"🔍 Verifying stored legal document: {document_id}")
             
             # Try to find the document immediately after storage
-            verification_response = self.index.query(
+            verification_response = await asyncio.to_thread(
+                self.index.query,
                 vector=[0.0] * self.target_dimension,
                 filter={"document_id": {"$eq": document_id}},
                 top_k=expected_chunks + 5,
@@ -545,7 +661,8 @@ class VectorService:
         
         try:
             # Check if ANY vectors exist in the index
-            total_vectors = self.index.query(
+            total_vectors = await asyncio.to_thread(
+                self.index.query,
                 vector=query_embedding.tolist(),
                 top_k=5,
                 include_metadata=True,
@@ -571,7 +688,8 @@ class VectorService:
             logger.info(f"📋 Getting legal document info for: {document_id}")
             
             # Try to find any vectors that match the document_id pattern
-            search_response = self.index.query(
+            search_response = await asyncio.to_thread(
+                self.index.query,
                 vector=[0.0] * self.target_dimension,
                 filter={"document_id": {"$eq": document_id}},
                 top_k=100,
@@ -588,7 +706,7 @@ class VectorService:
                 }
             
             # Get total index stats
-            index_stats = self.index.describe_index_stats()
+            index_stats = await asyncio.to_thread(self.index.describe_index_stats)
             
             logger.info(f"✅ Found {len(search_response.matches)} chunks for legal document {document_id}")
             
@@ -613,7 +731,8 @@ class VectorService:
         """Delete all chunks for a legal document"""
         try:
             # First, get all vector IDs for this document
-            search_response = self.index.query(
+            search_response = await asyncio.to_thread(
+                self.index.query,
                 vector=[0.0] * self.target_dimension,
                 filter={"document_id": {"$eq": document_id}},
                 top_k=10000,
@@ -632,7 +751,7 @@ class VectorService:
             batch_size = 1000
             for i in range(0, len(vector_ids), batch_size):
                 batch_ids = vector_ids[i:i + batch_size]
-                self.index.delete(ids=batch_ids, namespace="")
+                await asyncio.to_thread(self.index.delete, ids=batch_ids, namespace="")
                 logger.info(f"Deleted batch of {len(batch_ids)} vectors from legal document")
             
             logger.info(f"Successfully deleted {len(vector_ids)} chunks for legal document {document_id}")
@@ -642,6 +761,18 @@ class VectorService:
             logger.error(f"Failed to delete legal document: {str(e)}")
             return False
 
+    async def warmup(self):
+        """
+        Load the embedding model's ONNX session and open the Pinecone connection
+        at startup, so the first retrieval doesn't pay for either.
+        """
+        try:
+            await asyncio.to_thread(self.create_embeddings, ["warmup legal document query"])
+            await asyncio.to_thread(self.index.describe_index_stats)
+            logger.info("✅ Vector service warmed (embedding model + Pinecone connection)")
+        except Exception as e:
+            logger.warning(f"⚠️ Vector service warmup failed: {str(e)}")
+
     def check_index_info(self) -> Dict[str, Any]:
         """Check index dimensions and stats"""
         try:
@@ -679,10 +810,11 @@ class VectorService:
         """Health check for enhanced legal document vector service"""
         try:
             # Test basic index operations
-            test_embedding = self.create_embeddings(["health check test legal document"])
+            test_embedding = await self.create_embeddings_async(["health check test legal document"])
             
             # Try a simple query
-            test_query = self.index.query(
+            test_query = await asyncio.to_thread(
+                self.index.query,
                 vector=test_embedding[0].tolist(),
                 top_k=1,
                 include_metadata=False,
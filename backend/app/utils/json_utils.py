@@ -0,0 +1,119 @@
+# json_utils.py - Helpers for recovering JSON from raw LLM output
+import json
+import re
+from typing import Any, Optional, Union
+
+import orjson
+
+# Only braces, quotes and backslashes affect nesting; finditer jumps between
+# them at C speed instead of stepping through every character in Python.
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+
+def extract_json_span(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text, or None.
+    Single forward scan tracking brace depth; braces inside JSON strings
+    (including escaped quotes) are ignored.
+    """
+    start = text.find('{')
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped_pos = -1
+
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == escaped_pos:
+            continue
+
+        char = text[pos]
+        if in_string:
+            if char == '\\':
+                escaped_pos = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+
+    return None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON with orjson, falling back to the stdlib for inputs orjson
+    rejects (e.g. NaN literals). Raises json.JSONDecodeError either way,
+    since orjson.JSONDecodeError subclasses it.
+    """
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+
+class JsonSpanScanner:
+    """
+    Incremental extract_json_span for streamed text.
+    Each feed() scans only the new chunk, carrying brace depth and string state
+    across chunk boundaries, and returns the first balanced {...} object as soon
+    as it closes (None until then).
+    """
+
+    def __init__(self):
+        self._parts = []
+        self._length = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escaped_pos = -1
+        self.span: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far"""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        offset = self._length
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        if self.span is not None:
+            return self.span
+
+        scan_from = 0
+        if self._start < 0:
+            scan_from = chunk.find('{')
+            if scan_from < 0:
+                return None
+            self._start = offset + scan_from
+
+        for match in _JSON_TOKEN_RE.finditer(chunk, scan_from):
+            pos = match.start()
+            if offset + pos == self._escaped_pos:
+                continue
+
+            char = chunk[pos]
+            if self._in_string:
+                if char == '\\':
+                    self._escaped_pos = offset + pos + 1
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    self.span = self.text[self._start:offset + pos + 1]
+                    return self.span
+
+        return None
@@ -0,0 +1,44 @@
+# single_flight.py - Coalesce concurrent identical async work
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    At most one in-flight call per key: callers that arrive while a call for
+    the same key is running await its result instead of starting their own.
+    Joiners receive the very same object, so copy it before mutating it.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, joined); joined is True when another caller's result was reused"""
+        future = self._inflight.get(key)
+        if future is not None:
+            try:
+                # shield: a cancelled joiner must not cancel the leader's call
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This caller was cancelled
+                # The leader was cancelled (e.g. client disconnect); take over the call
+                return await self.run(key, factory)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await factory()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody joined
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._inflight[key]
@@ -0,0 +1,17 @@
+# time_utils.py - Cheap response timestamps
+import time
+from datetime import datetime
+
+# Formatted timestamp reused for up to half a second, so busy workers pay the
+# localtime/tz lookup and isoformat at most twice a second instead of per response
+_TIMESTAMP_TTL = 0.5
+_ts_cache = {"t": 0.0, "s": ""}
+
+
+def now_iso() -> str:
+    """Local-time ISO timestamp (same format as datetime.now().isoformat())"""
+    t = time.time()
+    if t - _ts_cache["t"] > _TIMESTAMP_TTL:
+        _ts_cache["s"] = datetime.fromtimestamp(t).isoformat()
+        _ts_cache["t"] = t
+    return _ts_cache["s"]